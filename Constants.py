@@ -14,6 +14,38 @@ CELL_SIZE = 8
 FINISH = 500
 TICK = 300
 
+# World Storage
+CHUNK_SIZE = 64             # Cells per chunk side
+SPARSE_CELLS = 4000000      # Larger worlds allocate chunks lazily
+
+# Viewport
+WINDOW_SIZE_X = 900
+WINDOW_SIZE_Y = 900
+MAX_ZOOM = 32               # Pixels per cell
+DETAIL_ZOOM = 4             # Life shapes drawn from this zoom on
+ZOOM_STEP = 1.25
+LOD_SAMPLES = 2             # Sampled cells per block side when zoomed out
+PALETTE_LEVELS = 64         # Shades of the soil and energy displays
+
+# Fast-Forward & Simulation Thread
+RENDER_FPS = 60             # Window refresh rate, independent of the steps
+MAX_STEPS_PER_FRAME = 1000
+SAVE_QUEUE = 32             # Frames waiting to be saved before the steps wait
+RENDER_SLOTS = 8            # Shared-memory ring slots for the render workers
+FRAME_LEVEL = 6             # zlib level of the frame file
+
+# Early End of a Run
+STEADY_WINDOW = 200         # Steps the statistics must stay put
+STEADY_TOLERANCE = 0.01     # Relative spread still counted as steady
+END_ACTION = "off"          # "stop", "cheap" or "off", a watched run goes on until closed
+HEADLESS_END_ACTION = "stop"  # Queued runs (tools.jobs) have nobody to close them
+END_ON = ("extinction", "steady state")   # "dominance" ends when one family is left
+
+# Memory Accounting
+MEMORY_EVERY = 0            # Steps between memory reports, 0 is off
+MEMORY_ACTION = "warn"      # Past the budget: "warn" or "abort"
+MEMORY_TOP = 10             # tracemalloc allocators listed per report, 0 skips tracing
+
 ENERGIC_TOXIC = (135, 206, 235)
 ORGANIC_TOXIC = (255, 68, 51)
 REPROD_MIN = 0.002
@@ -29,15 +61,15 @@ GREEN = (0, 128, 0)      # Leaf
 COLONIES_COLOR = {}
 BLACK = (0, 0, 0)
 
-fields = {
+fields = (
     "mutation_rate",
     "rotate_skills",
     "rotate_rate",
     "radio_rate",
     "root_rate",
-    "leaf_rate"
+    "leaf_rate",
     "newb_rate",
-}
+)
 
 LIFELENGTH = 10
 ENERGY_START = 30
@@ -49,3 +81,7 @@ FREEZE_THRESHOLD = 5
 # Directions
 LEFT, TOP, RIGHT, BOTTOM = 1, 2, 3, 4
 DIRECTIONS = [LEFT, TOP, RIGHT, BOTTOM]
+
+# Life Type Codes (Grid Maps)
+EMPTY, LEAF, ROOT, RADIO, NEWBORN, PIPE = 0, 1, 2, 3, 4, 5
+BLOCKING = (ROOT, PIPE)     # Types no other life builds over
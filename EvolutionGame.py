@@ -1,139 +1,199 @@
 # Developed by Anton Melnychuk          March 1st 2024
 # For ASTR 330 Class                    Yale University
 
-# GUI Visualization
-import tkinter as tk
-from tkinter import ttk
-from tkinter import messagebox
-
 # Imports
-import pygame
 import random
 import math
+import json
 import os
+import time
+
+import numpy as np
 
 import Life
+import World
+import Render
+import Simulation
+import Outcome
+import RenderPool
 import Constants
-from tools import parse_video
+from tools import pacing
+from tools.lazy_import import lazy_module
+
+# GUI Visualization & Video Tools (imported on first use,
+# so the Sector engine runs without them installed)
+tk = lazy_module("tkinter")
+ttk = lazy_module("tkinter.ttk")
+messagebox = lazy_module("tkinter.messagebox")
+pygame = lazy_module("pygame")
+parse_video = lazy_module("tools.parse_video")
+telemetry = lazy_module("tools.telemetry")
+replay = lazy_module("tools.replay")
+lineage = lazy_module("tools.lineage")
+frames = lazy_module("tools.frames")
+memory = lazy_module("tools.memory")
+
+# Sector Configuration (updated by configure)
+FODLER_PATH = "./output"
+TICK = Constants.TICK
+FAMILIES_COUNT = Constants.FAMILIES_COUNT
+SECTOR_SIZE_X = Constants.SECTOR_SIZE_X
+SECTOR_SIZE_Y = Constants.SECTOR_SIZE_Y
+SECTOR_BORDER = Constants.SECTOR_BORDER
+DISPLAY = Constants.DISPLAY
+LIFELENGTH = Constants.LIFELENGTH
+ENERGY_START = Constants.ENERGY_START
+ENERGY_RELEASED = Constants.ENERGY_RELEASED
+SOIL_RELEASED = Constants.SOIL_RELEASED
+AGE_INCREASE = Constants.AGE_INCREASE
+FREEZE_THRESHOLD = Constants.FREEZE_THRESHOLD
+SPARSE_WORLD = None
+CHUNK_SIZE = Constants.CHUNK_SIZE
+
+
+class Occupant:
+    ''' Cell.occupied: Every Placement & Removal Updates the Maps of the Chunk
+
+        Only writes go through here, reads find the life in the instance
+        dict like any plain attribute (no __get__), the hottest read of the
+        step loop stays free. '''
+
+    def __set__(self, cell, life) -> None:
+        cell.__dict__["occupied"] = life
+        cell.chunk.place(cell.idx, life)
 
 
 class Cell:
-    def __init__(self, x, y):
+    occupied = Occupant()
+
+    def __init__(self, x, y, chunk, idx):
         self.x = x
         self.y = y
 
+        # Cell Fields Live in the Layers of its World Chunk
+        self.chunk = chunk
+        self.idx = idx
+
         self.light = 0
         self.occupied = None
-        self.energy_level = 0
-        self.organic_level = 0
+
+    @property
+    def energy_level(self) -> float:
+        return self.chunk.energy[self.idx]
+
+    @energy_level.setter
+    def energy_level(self, value) -> None:
+        self.chunk.energy[self.idx] = value
+
+    @property
+    def organic_level(self) -> float:
+        return self.chunk.organic[self.idx]
+
+    @organic_level.setter
+    def organic_level(self, value) -> None:
+        self.chunk.organic[self.idx] = value
     
     def set_living_cell(self, life) -> None:
         self.occupied = life
 
-    def kill_life(self) -> None:
-        ''' Transfer Life Energy to the Cell '''
+    def kill_life(self, successor=None) -> None:
+        ''' Transfer Life Energy to the Cell, the Successor Takes its Place '''
 
         if self.occupied:
             self.organic_level += Constants.SOIL_RELEASED
             self.energy_level += Constants.ENERGY_RELEASED
-            self.occupied = None
+            self.occupied = successor
+        elif successor:
+            self.occupied = successor
 
-    def check_position(self) -> object:
-        return {self.x, self.y}
-    
+    def check_position(self) -> tuple:
+        return self.x, self.y
 
-    # Options for the Video Visualisation
-    # SOIL, ENERGY, COLOR
 
-    def draw_color(self, surface) -> None:
-        ''' Draws the Cell & Life by COLOR '''
+class SectorState:
+    ''' Read-Only Picture of a Sector after a Step
 
-        if self.occupied:
-            if isinstance(self.occupied, Life.Leaf):
-
-                # Draw Instance of the Leaf
-
-                if self.occupied.direction % 2 == 0:
-                    pygame.draw.ellipse(surface, self.occupied.color,
-                        (self.x + Constants.CELL_SIZE // 4, self.y, Constants.CELL_SIZE // 2, Constants.CELL_SIZE * 1.05), 0)
-                else:
-                    pygame.draw.ellipse(surface, self.occupied.color,
-                        (self.x, self.y + Constants.CELL_SIZE // 4, Constants.CELL_SIZE * 1.05, Constants.CELL_SIZE // 2), 0)
-                    
-            elif isinstance(self.occupied, Life.Root) or isinstance(self.occupied, Life.Radio):
-
-                offset = Constants.CELL_SIZE // 2
-                pygame.draw.circle(surface, self.occupied.color,
-                    (self.x + offset, self.y + offset), Constants.CELL_SIZE // 2, 0)
-                
-            elif isinstance(self.occupied, Life.Newborn):
+        Counters are copied. Layers are read-only views of the live grid
+        (no copy in a dense world, assembled once in a sparse one) that are
+        only valid until the next step: copy what has to be kept. '''
 
-                offset = Constants.CELL_SIZE // 2
-                pygame.draw.circle(surface, self.occupied.color,
-                    (self.x + offset, self.y + offset), Constants.CELL_SIZE // 2, 1)
-                
-            elif isinstance(self.occupied, Life.Pipe):
-
-                # Draw Instance of the Pipe
-
-                pipe_size = Constants.CELL_SIZE // 2
-                offset = (Constants.CELL_SIZE - pipe_size) // 2
-
-                if self.occupied.direction % 2 == 0:
-                    pygame.draw.rect(
-                        surface, self.occupied.color, 
-                        (self.x + offset, self.y + offset, pipe_size // 4, Constants.CELL_SIZE), 0)
-                else: 
-                    pygame.draw.rect(
-                        surface, self.occupied.color, 
-                        (self.x + offset, self.y + offset, Constants.CELL_SIZE, pipe_size // 4), 0)
-        else:
-
-            if self.organic_level > Constants.ORGANIC_THRESHOLD:
-                pygame.draw.rect(
-                    surface, Constants.ORGANIC_TOXIC,
-                    (self.x, self.y, Constants.CELL_SIZE, Constants.CELL_SIZE), 0)
-            if self.energy_level > Constants.ENERGY_THRESHOLD:
-                pygame.draw.rect(
-                    surface, Constants.ENERGIC_TOXIC,
-                    (self.x, self.y, Constants.CELL_SIZE, Constants.CELL_SIZE), 0)
-    
-    def draw_soil(self, surface) -> None:
-        ''' Draws the Cell by SOLID energy '''
+    def __init__(self, sector):
+        self.sector = sector
+        self.step = sector.step_count
+        self.day = sector.day_counter
+        self.population = sector.population.copy()
+        self.newborn_population = sector.newborn_population.copy()
+        self.newborn_count = sector.newborn_count
+        self.family_count = list(sector.family_count)
+        self.gathered_energy = sector.gathered_energy.copy()
+        self.harvested_energy = sector.harvested_energy.copy()
+        self.end_reason = sector.end_reason
+        self.layers = {}
 
-        soil_level_clipped = min(max(self.organic_level, 0), 1)
-        color_value = int(255 * soil_level_clipped)
-        color = (255, 255 - color_value, 0)
+    def layer(self, name) -> np.ndarray:
+        if self.sector.step_count != self.step:
+            raise RuntimeError(f"State of step {self.step} is stale, the Sector is at step {self.sector.step_count}")
 
-        pygame.draw.rect(surface, color, (self.x, self.y, Constants.CELL_SIZE, Constants.CELL_SIZE))
+        if name not in self.layers:
+            grid = self.sector.world.bitmap() if name == "occupied" else self.sector.world.dense(name)
+            view = grid.view()
+            view.flags.writeable = False
+            self.layers[name] = view
 
-    def draw_energy(self, surface) -> None:
-        ''' Draws the Cell by ENERGY left '''
+        return self.layers[name]
 
-        energy_color = self.calculate_energy_color()
-        pygame.draw.rect(surface, energy_color, (self.x, self.y, Constants.CELL_SIZE, Constants.CELL_SIZE))
+    @property
+    def energy(self) -> np.ndarray:
+        return self.layer("energy")
 
-    # Helper Functions
+    @property
+    def organic(self) -> np.ndarray:
+        return self.layer("organic")
 
-    def calculate_energy_color(self) -> tuple:
-        ''' Calculate energy color based on organic level '''
+    @property
+    def types(self) -> np.ndarray:
+        ''' Life Type Code per Cell (Constants.EMPTY when Free) '''
 
-        energy_level = self.organic_level
-        if energy_level < 0.5:
-            r = int(255 * energy_level * 2)
-            g = int(255 * energy_level * 2)
-            b = int(255 * (1 - energy_level))
-        else:
-            r = int(255 * (1 - energy_level))
-            g = int(255 * (1 - energy_level))
-            b = int(255 * (1 - energy_level) * 2)
+        return self.layer("type")
+
+    @property
+    def family(self) -> np.ndarray:
+        return self.layer("family")
+
+    @property
+    def direction(self) -> np.ndarray:
+        return self.layer("direction")
+
+    @property
+    def occupied(self) -> np.ndarray:
+        ''' Occupancy Bitmap, Bit j % 64 of Word [i, j // 64] is Cell (i, j)
+
+            The bitmap of the grid itself in a dense world, World.unpack_bits
+            turns it into one bool per cell. '''
+
+        return self.layer("occupied")
+
+    @property
+    def alive(self) -> bool:
+        return bool(self.population.any())
 
-        return (r, g, b)
 
-        
 class Sector:
     def __init__(self, **kwargs):
-        self.cells = self.create_cells()
+        # Grid Indexed by Cell (x, y) // CELL_SIZE
+        shape = (len(range(0, SECTOR_SIZE_X, Constants.CELL_SIZE)),
+                 len(range(0, SECTOR_SIZE_Y, Constants.CELL_SIZE)))
+        sparse = SPARSE_WORLD
+        if sparse is None:
+            sparse = shape[0] * shape[1] > Constants.SPARSE_CELLS
+
+        # Chunk fields and step order follow the global random seed
+        self.seed = random.getrandbits(64)
+        self.rng = np.random.default_rng(self.seed)
+        self.relax_steps = 0
+
+        self.world = World.World(shape, self.create_cell, self.init_chunk, self.FIELD_DEFAULTS,
+                                 sparse=sparse, chunk_size=CHUNK_SIZE)
 
         self.display_type = None
         self.day_counter = 0
@@ -143,47 +203,112 @@ class Sector:
         self.reading_x = 0
         self.reading_y = 0
 
-        # Gather all energy to a dictionary
-        self.gathered_energy = [0] * FAMILIES_COUNT
+        # Gather all energy per family
+        self.gathered_energy = np.zeros(FAMILIES_COUNT)
+        # All energy ever harvested per family (gathered energy is handed on)
+        self.harvested_energy = np.zeros(FAMILIES_COUNT)
         # Keep track of survived families
         self.family_count = [0] * FAMILIES_COUNT
+        self.population = np.zeros(FAMILIES_COUNT, dtype=int)
+        self.newborn_population = np.zeros(FAMILIES_COUNT, dtype=int)
+        self.newborn_count = 0
+        self.step_count = 0
+        self.end_reason = None
+        self.lineage = None
 
         self.generate_borders()
         self.generate_life(**kwargs)
+        self.update_life_maps()
+
+    # Values of never-touched (sparse) positions, fields at rest
+    FIELD_DEFAULTS = {"energy": 0.2, "organic": 0.05, "type": Constants.EMPTY, "family": -1, "direction": 0}
+
+    # Whole-Grid Maps (zero-copy for dense worlds)
+
+    @property
+    def energy_map(self) -> np.ndarray:
+        return self.world.dense("energy")
+
+    @property
+    def organic_map(self) -> np.ndarray:
+        return self.world.dense("organic")
+
+    @property
+    def type_map(self) -> np.ndarray:
+        return self.world.dense("type")
+
+    @property
+    def family_map(self) -> np.ndarray:
+        return self.world.dense("family")
+
+    @property
+    def direction_map(self) -> np.ndarray:
+        return self.world.dense("direction")
+
+    def grant_life_access(self) -> None:
+        ''' Grant Private Access to grid (encapsulation) to Cells
+            Instead of Prodiding whole Grid access to all Cells '''
+
+        Life.Life.set_gridcheck_function(self.check_occupied)
+        Life.Life.set_gridpos_function(self.reading_position)
+        Life.Newborn.set_private_function(self.update_next)
+        # The hook is shared by every Sector, a log of an earlier one is closed
+        Life.Life.set_lineage_log(self.lineage)
+
+    def record_lineage(self, log) -> None:
+        ''' Log Every Birth from now on, the Lives on the Grid as Founders '''
+
+        self.lineage = log
+        log.tick = self.step_count
+        for cell in self.world.cells.values():
+            if cell.occupied:
+                cell.occupied.uid = log.found(cell.occupied)
+        # The founders are on disk at once, the log can be opened from the start
+        log.flush()
+
+        Life.Life.set_lineage_log(log)
+
+    def reading_position(self) -> tuple:
+        ''' Pixel X-Y of the Cell whose Life is Executing '''
+
+        return self.reading_x, self.reading_y
 
     def change_display_type(self, display):
         self.display_type = display
 
-    def save_energy(self, family_idx, energy) -> None:
-        self.gathered_energy[family_idx] += energy
-
 
     # Functions for One-time Definition
 
-    def create_cells(self) -> list:
-        ''' Define Cells on GRID Defition '''
+    def create_cell(self, i, j, chunk, idx) -> Cell:
+        ''' Define a Cell on its First Access '''
 
-        cells = []
-        for x in range(0, SECTOR_SIZE_X, Constants.CELL_SIZE):
-            for y in range(0, SECTOR_SIZE_Y, Constants.CELL_SIZE):
-                cell = Cell(x, y)
-                cell.energy_level = random.uniform(0, 0.2)
-                cell.organic_level = random.uniform(0, 0.1)
+        return Cell(i * Constants.CELL_SIZE, j * Constants.CELL_SIZE, chunk, idx)
 
-                cells.append(cell)
+    def init_chunk(self, chunk) -> None:
+        ''' Random Starting Fields of a Chunk on its First Allocation '''
 
-        return cells
+        rng = np.random.default_rng((self.seed, *chunk.key))
+        chunk.energy[:] = rng.uniform(0, 0.2, chunk.shape)
+        chunk.organic[:] = rng.uniform(0, 0.1, chunk.shape)
+
+        # Chunks allocated late catch up on the energy relaxation they missed
+        if self.relax_steps:
+            missing = np.ceil((0.2 - chunk.energy) / 0.005)
+            chunk.energy += 0.005 * np.minimum(missing, self.relax_steps)
+
+    def random_cell(self) -> Cell:
+        return self.world.cell(random.randrange(self.world.shape[0]), random.randrange(self.world.shape[1]))
     
     def generate_life(self, **kwargs) -> None:
         ''' Pull Life into Cells '''
 
         for family_idx in range(FAMILIES_COUNT):
-            random_cell = random.choice(self.cells)
+            random_cell = self.random_cell()
             
             # Keep searching for a valid to live cell
             while random_cell.occupied is not None and \
                   random_cell.organic_level != 1:
-                random_cell = random.choice(self.cells)
+                random_cell = self.random_cell()
 
             # Random / User DNA Life
             dna = Life.DNA()
@@ -192,9 +317,6 @@ class Sector:
             else: 
                 dna = Life.DNA(**kwargs)
             life = Life.Newborn(family_idx, dna)
-
-            # Grant Parent Child to Access Cell X-Y Coords
-            life.set_gridpos_function(random_cell.check_position)
             life.define_color()
 
             random_cell.set_living_cell(life)
@@ -203,33 +325,21 @@ class Sector:
         ''' Generate toxic borders to keep evolution within families
             for a bit before letting them attack others '''
 
-        for row_idx in range(0, SECTOR_SIZE_X, Constants.CELL_SIZE):
-            for col_idx in range(0, SECTOR_SIZE_Y, Constants.CELL_SIZE):
-                padding = SECTOR_BORDER * Constants.CELL_SIZE
-                idx_flat = (row_idx // Constants.CELL_SIZE) * (SECTOR_SIZE_Y // Constants.CELL_SIZE) + (col_idx // Constants.CELL_SIZE)
-                cell = self.cells[idx_flat]
-
-                if (cell.x < padding or
-                    cell.x > (SECTOR_SIZE_X - padding) - Constants.CELL_SIZE or
-                    cell.y < padding or
-                    cell.y > (SECTOR_SIZE_Y - padding) - Constants.CELL_SIZE):
-                        
-                        self.cells[idx_flat].organic_level = 1
-        
+        width, height = self.world.shape
+        padding = SECTOR_BORDER
+
+        self.world.fill("organic", 0, padding, 0, height, 1)
+        self.world.fill("organic", width - padding, width, 0, height, 1)
+        self.world.fill("organic", 0, width, 0, padding, 1)
+        self.world.fill("organic", 0, width, height - padding, height, 1)
+
         middlex_idx = SECTOR_SIZE_X // Constants.CELL_SIZE // 2
         middley_idx = SECTOR_SIZE_Y // Constants.CELL_SIZE // 2
 
         border_thickness = SECTOR_BORDER // 2
-    
-        for row_idx in range(middlex_idx * Constants.CELL_SIZE - border_thickness * Constants.CELL_SIZE, (middlex_idx + 1) * Constants.CELL_SIZE + border_thickness * Constants.CELL_SIZE):
-            for col_idx in range(0, SECTOR_SIZE_Y, Constants.CELL_SIZE):
-                idx_flat = (row_idx // Constants.CELL_SIZE) * (SECTOR_SIZE_Y // Constants.CELL_SIZE) + (col_idx // Constants.CELL_SIZE)
-                self.cells[idx_flat].organic_level = 1
-                
-        for col_idx in range(middley_idx * Constants.CELL_SIZE - border_thickness * Constants.CELL_SIZE, (middley_idx + 1) * Constants.CELL_SIZE + border_thickness * Constants.CELL_SIZE):
-            for row_idx in range(0, SECTOR_SIZE_X, Constants.CELL_SIZE):
-                idx_flat = (row_idx // Constants.CELL_SIZE) * (SECTOR_SIZE_Y // Constants.CELL_SIZE) + (col_idx // Constants.CELL_SIZE)
-                self.cells[idx_flat].organic_level = 1
+
+        self.world.fill("organic", max(0, middlex_idx - border_thickness), middlex_idx + border_thickness + 1, 0, height, 1)
+        self.world.fill("organic", 0, width, max(0, middley_idx - border_thickness), middley_idx + border_thickness + 1, 1)
 
 
     # Helper Functions
@@ -271,13 +381,9 @@ class Sector:
         if neighbor_cell:
 
             # Prevent the colonies that are the same type eat each other
-
-            if (neighbor_cell.occupied and neighbor_cell.occupied.family_idx == family_idx):
-                return None
-
             # We can eat all kind of cells except the Roots and the Wood
-            
-            if neighbor_cell.occupied and (isinstance(neighbor_cell.occupied, Life.Root) or isinstance(neighbor_cell.occupied, Life.Pipe)):
+
+            if neighbor_cell.chunk.blocks(neighbor_cell.idx, family_idx):
                 return None
             
             # We can build on energy toxic cell if not Radio Cell
@@ -290,55 +396,95 @@ class Sector:
             if neighbor_cell.organic_level > Constants.ORGANIC_THRESHOLD and not isinstance(life, Life.Root):
                 return None
 
-            # Eat Cell if Needed
+            # Eat Cell if Needed (one placement replaces it)
 
-            neighbor_cell.kill_life()
+            neighbor_cell.kill_life(life)
             neighbor_cell.energy_level += Constants.SOIL_RELEASED
 
             life.energy_level += Constants.ENERGY_RELEASED
-            neighbor_cell.set_living_cell(life)
 
             return neighbor_cell
     
-    # Leaf
-        
-    def get_light_energy(self) -> None:
-        curr_cell = self.get_cell_at(self.reading_x, self.reading_y)
+    # Whole-Grid Energy Harvesting (chunk by chunk)
 
-        # If two leaf are next to each other => 0 energy
+    def update_life_maps(self) -> None:
+        ''' Living Cells & Newborns per Family from the Maps
 
-        for DIR in Constants.DIRECTIONS:
-            x, y = self.move_and_wrap(self.reading_x, self.reading_y, DIR)
-            next_cell = self.get_cell_at(x, y)
+            The type, family & direction maps and the occupancy bitmap are
+            kept in sync by Cell.occupied on every placement and removal, the
+            counters are only gathered here, in bulk. '''
 
-            if next_cell and isinstance(next_cell.occupied, Life.Leaf):
-                self.save_energy(next_cell.occupied.family_idx, 0)
-                self.save_energy(curr_cell.occupied.family_idx, 0)
+        # Living cells & newborns (the only cells that reproduce) per family
 
-        if curr_cell and isinstance(curr_cell.occupied, Life.Leaf):
-            self.save_energy(curr_cell.occupied.family_idx, self.light_global)
+        families = [np.zeros(0, dtype=np.int16)]
+        newborns = [np.zeros(0, dtype=np.int16)]
+        for chunk in self.world.active_chunks():
+            chunk.alive = bool(chunk.occupancy.any())
+            if chunk.alive:
+                families.append(chunk.family[chunk.occupied()])
+                newborns.append(chunk.family[chunk.type == Constants.NEWBORN])
 
-    # Root
-            
-    def get_soil_energy(self) -> None:
-        curr_cell = self.get_cell_at(self.reading_x, self.reading_y)
+        self.population = np.bincount(np.concatenate(families), minlength=FAMILIES_COUNT)
+        self.newborn_population = np.bincount(np.concatenate(newborns), minlength=FAMILIES_COUNT)
 
-        if curr_cell and curr_cell.occupied:
-            curr_cell.organic_level = curr_cell.organic_level * 0.7
-            energy = curr_cell.organic_level * 0.3
+    def harvest_energy(self) -> None:
+        ''' Leaf (light), Root (soil) and Radio (energy) Uptake for All Cells at Once '''
 
-            self.save_energy(curr_cell.occupied.family_idx, energy)
+        families, energies = [np.zeros(0, dtype=np.int16)], [np.zeros(0)]
 
-    # Radio
-            
-    def get_radio_energy(self) -> None:
-        curr_cell = self.get_cell_at(self.reading_x, self.reading_y)
+        for chunk in self.world.chunks.values():
+            if not chunk.alive:
+                continue
+
+            # If two leaf are next to each other => 0 energy
+            # Neighbours are shifted maps, wrapped around the torus
+
+            leaf_grid = self.world.padded(chunk, "type") == Constants.LEAF
+            crowded = leaf_grid[:-2, 1:-1] | leaf_grid[2:, 1:-1] | \
+                      leaf_grid[1:-1, :-2] | leaf_grid[1:-1, 2:]
+
+            leaf = chunk.type == Constants.LEAF
+            root = chunk.type == Constants.ROOT
+            radio = chunk.type == Constants.RADIO
+
+            energy = np.zeros(chunk.shape)
+            energy[leaf & ~crowded] = self.light_global
+
+            # Root and Radio keep 70% of the field and gather 30% of the rest
+
+            chunk.organic[root] *= 0.7
+            energy[root] = chunk.organic[root] * 0.3
+
+            chunk.energy[radio] *= 0.7
+            energy[radio] = chunk.energy[radio] * 0.3
+
+            gatherers = leaf | root | radio
+            families.append(chunk.family[gatherers])
+            energies.append(energy[gatherers])
+
+        # Per-family totals
+
+        harvested = np.bincount(np.concatenate(families), weights=np.concatenate(energies), minlength=FAMILIES_COUNT)
+        self.gathered_energy += harvested
+        self.harvested_energy += harvested
+
+    def relax_fields(self) -> None:
+        ''' The Energy Level in Ground Aims to a Default Values '''
 
-        if curr_cell and curr_cell.occupied:
-            curr_cell.energy_level = curr_cell.energy_level * 0.7
-            energy = curr_cell.energy_level * 0.3
+        for chunk in self.world.active_chunks():
+            high = chunk.energy > 0.3
+            low = chunk.energy < 0.2
+            chunk.energy[high] -= 0.005
+            chunk.energy[low] += 0.005
 
-            self.save_energy(curr_cell.occupied.family_idx, energy)
+        self.relax_steps += 1
+
+    def settle_chunks(self) -> None:
+        ''' Let the Step Loop Skip Chunks with no Life and Fields at Rest '''
+
+        for chunk in self.world.active_chunks():
+            if not chunk.alive and ((chunk.energy >= 0.2) & (chunk.energy <= 0.3)).all():
+                self.world.settle(chunk)
     
 
     # Helper Functions
@@ -351,72 +497,60 @@ class Sector:
         self.light_global = scaled_value
         self.day_counter += 3
 
-    def draw(self, surface):
-
-        # Display Types
-
-        if self.display_type == "color":
-            for cell in self.cells:
-                cell.draw_color(surface)
-
-        elif self.display_type == "soil":
-            for cell in self.cells:
-                cell.draw_soil(surface)
+    def board_stats(self) -> dict:
+        ''' Survival Counters and Family Colors Shown with a Frame '''
 
-        elif self.display_type == "energy":
-            for cell in self.cells:
-                cell.draw_energy(surface)
+        return {
+            "day_counter": self.day_counter,
+            "family_count": list(self.family_count),
+            "newborn_count": self.newborn_count,
+            "family_colors": [Constants.COLONIES_COLOR.get(idx, Constants.WHITE) for idx in range(len(self.family_count))],
+        }
 
-        # General Durvival Information Board
+    def capture(self, camera) -> Render.Frame:
+        ''' Copy of the Part of the Sector the Camera Sees '''
 
-        font = pygame.font.SysFont(None, 20)
-        total_sum = sum(self.family_count)
-        ftext = font.render("Family Count: " + str(total_sum), True, Constants.WHITE)
-        ntext = font.render("Newborn Cell Count: " + str(self.newborn_count), True, Constants.WHITE)
+        return Render.capture(self.world, camera.view(), self.board_stats())
 
-        ftext_rect = ftext.get_rect()
-        ftext_rect.topleft = (10, 24)
-        pygame.draw.rect(surface, (0, 0, 0), ftext_rect)
+    def draw(self, surface, camera=None):
+        ''' Draws the Sector, the Whole World unless a Camera is Given '''
 
-        surface.blit(ftext, ftext_rect)
+        if camera is None:
+            camera = Render.Camera(self.world.shape, surface.get_size())
 
-        ntext_rect = ntext.get_rect()
-        ntext_rect.topleft = (10, 10)
-        pygame.draw.rect(surface, (0, 0, 0), ntext_rect)
-        surface.blit(ntext, ntext_rect)
+        Render.draw(surface, self.capture(camera), camera, self.display_type)
 
     def get_cell_at(self, x, y):
-        ''' Search for Cell in Shuffled Set '''
+        ''' Look up (or Create) the Cell at Pixel Coordinates '''
 
-        for cell in self.cells:
-            if cell.x == x and cell.y == y:
-                return cell
-            
-        return None
+        return self.world.cell(x // Constants.CELL_SIZE, y // Constants.CELL_SIZE)
     
     def check_occupied(self, x, y, shift, idx):
+        ''' Neighbour Holds the Same Family, a Root or a Pipe '''
+
         xt, yt = self.move_and_wrap(x, y, shift)
-        check_life = self.get_cell_at(xt, yt).occupied
+        cell = self.get_cell_at(xt, yt)
 
-        if check_life and \
-            (check_life.family_idx == idx or \
-             isinstance(check_life, Life.Root or \
-             isinstance(check_life, Life.Pipe))):
-            
-            return True
-        
-        return False
+        return cell.chunk.blocks(cell.idx, idx)
 
 
     # To keep Canvas Clean
 
-    def remove_tail(self, curr_cell, visited=set()):
+    def remove_tail(self, curr_cell, visited=None):
         ''' On Cell Removal, Delete the Rest '''
 
-        # Check for cycles
+        # Check for cycles (a fresh set per removal, a shared default kept
+        # every cell ever removed alive and skipped their later tails)
+        if visited is None:
+            visited = set()
         if curr_cell in visited:
             return 
         visited.add(curr_cell)
+
+        # A life can die twice in one step (age, then toxic fields),
+        # its tail is already gone
+        if curr_cell.occupied is None:
+            return
         
         self.reading_x = curr_cell.x
         self.reading_y = curr_cell.y
@@ -440,18 +574,32 @@ class Sector:
 
     def step(self):
         ''' Executes One Step of the Cell Life Cycle '''
+        if self.lineage:
+            self.lineage.tick = self.step_count
         self.update_daynight()
+        self.harvest_energy()
 
         # Remove Cell Ordering
         # To Simulate Randomness
         # In the Execution
+        # Only chunks holding life are walked, position by position
 
-        random.shuffle(self.cells)
+        life_chunks = [chunk for chunk in self.world.chunks.values() if chunk.alive]
+        order = [np.zeros(0, dtype=np.int64)]
+        order += [chunk.global_keys(self.world.shape[1]) for chunk in life_chunks]
+        order = np.concatenate(order)
+        self.rng.shuffle(order)
+
+        cells = self.world.cells
         
         self.family_count = [0] * FAMILIES_COUNT
         self.newborn_count = 0
         
-        for cell in self.cells:
+        for key in order.tolist():
+            cell = cells.get(key)
+            if cell is None:
+                continue
+
             self.reading_x = cell.x
             self.reading_y = cell.y
 
@@ -479,19 +627,18 @@ class Sector:
                 cell.energy_level > Constants.ENERGY_THRESHOLD):
                     self.remove_tail(cell)
                     cell.occupied = None
-            
-            # The energy level in ground
-            # aims to a default values
-            
-            if cell.energy_level > 0.3:
-                cell.energy_level -= 0.005
-            elif cell.energy_level < 0.2:
-                cell.energy_level += 0.005
+
+        self.relax_fields()
 
         # Provide NewBorn Cells Gathered Energy 
         # And clean the uneccesary pipes
+
+        height = self.world.shape[1]
+        newborns = [cells[key] for chunk in self.world.chunks.values() if chunk.alive
+                    for key in chunk.global_keys(height)[(chunk.type == Constants.NEWBORN).ravel()].tolist()]
+        random.shuffle(newborns)
                 
-        for cell in self.cells:
+        for cell in newborns:
             self.reading_x = cell.x
             self.reading_y = cell.y
 
@@ -503,12 +650,57 @@ class Sector:
                     if life.energy_level < Constants.REPROD_MIN:
                         cell.occupied = None
 
+        # Grid maps of the finished step (also used by the next harvest)
 
-def main(**kwargs):
-    ''' Define OS Global Variables and GUI/Tk User Windows '''
+        self.update_life_maps()
+        self.settle_chunks()
+        self.step_count += 1
+
+
+    # Headless Runs (analysis pipelines, no rendering or disk output)
+
+    def states(self, steps=None, every=1, detector=None):
+        ''' Executes Steps and Yields a SectorState every few of them
+
+            Runs until `steps` are done, or forever without it: stop early
+            by leaving the loop (or closing the generator). With an
+            Outcome.EndDetector the run also ends on its own, the last
+            state carries the end_reason. '''
+
+        done = 0
+        while steps is None or done < steps:
+            self.step()
+            done += 1
+
+            if detector:
+                self.end_reason = detector.update(self)
+                if self.end_reason:
+                    yield SectorState(self)
+                    return
+
+            if done % every == 0:
+                yield SectorState(self)
+
+    def run(self, n_steps, detector=None) -> "SectorState":
+        ''' Executes n Steps in a Row (Fewer if the Detector Ends the Run),
+            Only the Final State is Built '''
+
+        step = self.step
+        for _ in range(n_steps):
+            step()
+            if detector:
+                self.end_reason = detector.update(self)
+                if self.end_reason:
+                    break
+
+        return SectorState(self)
+
+
+def configure(**kwargs) -> None:
+    ''' Define OS Global Variables from the User kwargs (GUI or Headless) '''
 
     global FODLER_PATH, TICK, FAMILIES_COUNT, SECTOR_SIZE_X, SECTOR_SIZE_Y, AGE_INCREASE, FREEZE_THRESHOLD, \
-        SECTOR_BORDER, DISPLAY, LIFELENGTH, ENERGY_START, ENERGY_RELEASED, SOIL_RELEASED
+        SECTOR_BORDER, DISPLAY, LIFELENGTH, ENERGY_START, ENERGY_RELEASED, SOIL_RELEASED, SPARSE_WORLD, CHUNK_SIZE
     
     # Update constants with user kwargs values
     TICK = kwargs.get('tick', 300)
@@ -526,71 +718,221 @@ def main(**kwargs):
     AGE_INCREASE = kwargs.get('age_increase', 1)
     FREEZE_THRESHOLD = kwargs.get('freeze', 5)
     DISPLAY = kwargs.get('display_type', "color")
+    SPARSE_WORLD = kwargs.get('sparse_world', None)
+    CHUNK_SIZE = kwargs.get('chunk_size', Constants.CHUNK_SIZE)
+
+
+def main(**kwargs):
+    ''' Define OS Global Variables and GUI/Tk User Windows '''
+
+    configure(**kwargs)
 
     pygame.init()
-    screen = pygame.display.set_mode((SECTOR_SIZE_X, SECTOR_SIZE_Y))
+
+    # Window no Larger than the Screen Limit, the Camera Pans & Zooms over the Sector
+    window = (min(SECTOR_SIZE_X, Constants.WINDOW_SIZE_X), min(SECTOR_SIZE_Y, Constants.WINDOW_SIZE_Y))
+    screen = pygame.display.set_mode(window)
     pygame.display.set_caption("Evolution Game")
 
     grid_display = Sector(**kwargs)
     grid_display.display_type = DISPLAY
+    grid_display.grant_life_access()
 
-    # Grant Private Access to grid (encapsulation) to Cells
-    # Instead of Prodiding whole Grid access to all Cells
-
-    Life.Life.set_gridcheck_function(grid_display.check_occupied)
-    Life.Newborn.set_private_function(grid_display.update_next)
-    Life.Leaf.set_private_function(grid_display.get_light_energy)
-    Life.Root.set_private_function(grid_display.get_soil_energy)
-    Life.Radio.set_private_function(grid_display.get_radio_energy)
+    camera = Render.Camera(grid_display.world.shape, window)
 
     clock = pygame.time.Clock()
 
     if not os.path.exists(FODLER_PATH):
         os.makedirs(FODLER_PATH)
 
-    running = True
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+    # Optional Live Metrics & Preview Server
+
+    monitor = None
+    if kwargs.get('telemetry_port'):
+        monitor = telemetry.Telemetry(kwargs['telemetry_port'])
+        monitor.start()
+
+    # Optional Compact Replay of the Run
+
+    recorder = None
+    if kwargs.get('replay_path'):
+        recorder = replay.ReplayWriter(kwargs['replay_path'], *grid_display.world.shape, FAMILIES_COUNT)
+        recorder.write_sector(grid_display)
+
+    # Optional Log of Every Birth (Parent, Step, Family, Type, DNA Mutation)
+
+    lineage_log = None
+    if kwargs.get('lineage_path'):
+        lineage_log = lineage.LineageWriter(kwargs['lineage_path'])
+        grid_display.record_lineage(lineage_log)
+
+    # Fast-Forward: K Steps per Frame at the TICK Rate (0 runs at full speed),
+    # Frames Saved Every N Steps or at a Steady Rate, from a Given Day on
+
+    # 0 Steps per Frame Adapts K to the Fastest Rate that Keeps the Window at RENDER_FPS
+
+    steps_per_frame = kwargs.get('steps_per_frame', 1)
+    pacer = pacing.StepPacer(steps_per_frame, TICK, max_steps=Constants.MAX_STEPS_PER_FRAME,
+                             target_fps=Constants.RENDER_FPS if steps_per_frame == 0 else None)
+    fast_forward_until = kwargs.get('fast_forward_until', 0)
+    saver = pacing.SaveSchedule(kwargs.get('save_every', 1), kwargs.get('save_fps'), fast_forward_until)
+
+    # The Sector Steps on its Own Thread, this Loop only Handles Input and Draws its Frames
+
+    # Saved Frames are Drawn and Encoded by Worker Processes when Asked for
+
+    render_pool = None
+    if kwargs.get('render_workers'):
+        render_pool = RenderPool.RenderPool(kwargs['render_workers'], window)
+
+    # Or into One Palette-Indexed Frame File instead of a Folder of PNGs
 
-            # Listen for key presses
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_c:
-                    grid_display.change_display_type("color")
-                elif event.key == pygame.K_s:
-                    grid_display.change_display_type("soil")
-                elif event.key == pygame.K_e:
-                    grid_display.change_display_type("energy")
+    frame_writer = None
+    if kwargs.get('frame_file'):
+        frame_writer = frames.FrameWriter(kwargs['frame_file'], window, grid_display.board_stats()["family_colors"],
+                                          level=kwargs.get('frame_level', Constants.FRAME_LEVEL))
+
+    # End Early on Extinction, Dominance or a Steady State ("stop"), or Run on Cheaply ("cheap")
+
+    end_action = kwargs.get('end_action', Constants.END_ACTION)
+    detector = Outcome.EndDetector(kwargs.get('end_on', Constants.END_ON)) if end_action != "off" else None
+
+    # Optional Memory Reports Every N Steps, Warns or Ends the Run past the Budget
+
+    memory_watch = None
+    if kwargs.get('memory_every', Constants.MEMORY_EVERY):
+        memory_watch = memory.MemoryWatch(kwargs.get('memory_every', Constants.MEMORY_EVERY),
+                                          kwargs.get('memory_budget_mb'),
+                                          kwargs.get('memory_action', Constants.MEMORY_ACTION),
+                                          kwargs.get('memory_top', Constants.MEMORY_TOP),
+                                          kwargs.get('memory_log'))
+
+    simulation = Simulation.Simulation(grid_display, camera, pacer, saver, recorder, monitor, fast_forward_until,
+                                       render_pool=render_pool, folder=FODLER_PATH, frame_writer=frame_writer,
+                                       detector=detector, end_action=end_action, memory_watch=memory_watch)
+    simulation.start()
+    frame = None
+    progress = kwargs.get('progress')
+
+    pan_keys = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
+
+    # Whatever ends the run (an error too), workers, files and servers are closed
+
+    try:
+        running = True
+        while running:
+            frame_started = time.perf_counter()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+
+                # Listen for key presses
                 elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:
+                    if event.key == pygame.K_c:
+                        grid_display.change_display_type("color")
+                    elif event.key == pygame.K_s:
+                        grid_display.change_display_type("soil")
+                    elif event.key == pygame.K_e:
+                        grid_display.change_display_type("energy")
+                    elif event.key == pygame.K_q:
                         running = False
-         
-        # Save the Screen to the Folder
-                
-        filename = str(grid_display.day_counter).zfill(8) + ".png"
-        pygame.image.save(screen, os.path.join(FODLER_PATH, filename))
 
-        # Clear Screen
+                    # Camera: arrows pan, +/- zoom, f fits the whole sector
+                    elif event.key in pan_keys:
+                        dx, dy = pan_keys[event.key]
+                        camera.pan(dx * window[0] // 10, dy * window[1] // 10)
+                    elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                        camera.zoom_at(Constants.ZOOM_STEP, (window[0] // 2, window[1] // 2))
+                    elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        camera.zoom_at(1 / Constants.ZOOM_STEP, (window[0] // 2, window[1] // 2))
+                    elif event.key == pygame.K_f:
+                        camera.fit()
+
+                    # Fast-Forward: ] doubles and [ halves the steps per frame
+                    elif event.key == pygame.K_RIGHTBRACKET:
+                        pacer.faster()
+                    elif event.key == pygame.K_LEFTBRACKET:
+                        pacer.slower()
+
+                # Mouse: wheel zooms at the pointer, dragging pans
+                elif event.type == pygame.MOUSEWHEEL:
+                    camera.zoom_at(Constants.ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+                elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+                    camera.pan(-event.rel[0], -event.rel[1])
+
+            # Save the Frames that are Due to the Folder (or Frame File), as they were Seen when Captured
+
+            for saved, saved_camera in simulation.saved_frames():
+                if frame_writer:
+                    frame_writer.write_frame(saved, saved_camera, grid_display.display_type)
+                    continue
+                screen.fill(Constants.BG)
+                Render.draw(screen, saved, saved_camera, grid_display.display_type)
+                filename = str(saved.stats["day_counter"]).zfill(8) + ".png"
+                pygame.image.save(screen, os.path.join(FODLER_PATH, filename))
 
-        screen.fill(Constants.BG)
-        grid_display.step()
-        
-        # Execute Life Step and Display
+            # Display the Latest Frame where the Camera Looks Now
 
-        grid_display.draw(screen)
+            frame = simulation.latest() or frame
+            if frame:
+                screen.fill(Constants.BG)
+                Render.draw(screen, frame, camera, grid_display.display_type)
+            pygame.display.flip()
 
-        pygame.display.flip()
-        clock.tick(TICK)
+            # The simulation captures through a copy, the camera moves on here
+            simulation.set_camera(camera)
 
-        # Save Images in the Range
+            if monitor and monitor.wants_frame():
+                monitor.publish_frame(*screen.get_size(), pygame.image.tostring(screen, "RGB"))
+
+            if simulation.error:
+                raise simulation.error
+            if simulation.done():
+                running = False
+
+            # A queued job (tools.jobs) is told the day and can end the run
+            if progress and progress(grid_display.day_counter):
+                running = False
 
-        if grid_display.day_counter > Constants.FINISH:
-            break
+            pacer.record_frame(time.perf_counter() - frame_started)
+            clock.tick(Constants.RENDER_FPS)
+
+    finally:
+        simulation.stop()
+        if render_pool:
+            render_pool.close()
+        if frame_writer:
+            frame_writer.close()
+        if memory_watch:
+            memory_watch.stop()
+        if monitor:
+            monitor.stop()
+        if recorder:
+            recorder.close()
+        if lineage_log:
+            lineage_log.close()
+            Life.Life.set_lineage_log(None)
+        pygame.quit()
+
+    # Record Why the Run Ended
+
+    outcome = {
+        "reason": grid_display.end_reason or "closed",
+        "detail": detector.detail if detector and grid_display.end_reason != Outcome.MEMORY else "",
+        "day": grid_display.day_counter,
+        "step": grid_display.step_count,
+        "population": grid_display.population.tolist(),
+    }
+    print(f"Run ended on day {outcome['day']}: {outcome['reason']}", f"({outcome['detail']})" if outcome['detail'] else "")
+    with open(os.path.join(FODLER_PATH, "outcome.json"), "w") as outcome_file:
+        json.dump(outcome, outcome_file, indent=2)
 
-    pygame.quit()
     folder_path = kwargs.get('folder_path', './output')
-    parse_video.combine_images_to_video(folder_path, folder_path+"_video.mp4")
+    open_video = kwargs.get('open_video', True)
+    if frame_writer:
+        parse_video.combine_frames_to_video(kwargs['frame_file'], folder_path+"_video.mp4", open_video)
+    else:
+        parse_video.combine_images_to_video(folder_path, folder_path+"_video.mp4", open_video)
 
     
 # User GUI Window
@@ -626,7 +968,21 @@ class DNADialog:
             "energy_released": "0.001",
             "soil_released": "0.001",
             "age_increase": "40",
-            "freeze": "1"
+            "freeze": "1",
+            "telemetry_port": "",
+            "replay_path": "",
+            "lineage_path": "",
+            "steps_per_frame": "1",
+            "save_every": "1",
+            "save_fps": "",
+            "fast_forward_until": "0",
+            "render_workers": "0",
+            "frame_file": "",
+            "frame_level": "6",
+            "end_action": Constants.END_ACTION,
+            "memory_every": "0",
+            "memory_budget_mb": "",
+            "memory_action": "warn"
         }
 
         entries = [
@@ -664,6 +1020,20 @@ class DNADialog:
             ("Soil Released:", "soil_released"),
             ("Step Age Increase:", "age_increase"),
             ("Freeze threshold:", "freeze"),
+            ("Telemetry Port (optional):", "telemetry_port"),
+            ("Replay File (optional):", "replay_path"),
+            ("Lineage Log (optional):", "lineage_path"),
+            ("Steps per Frame (0 = adaptive):", "steps_per_frame"),
+            ("Save Every N Steps:", "save_every"),
+            ("Save FPS (optional):", "save_fps"),
+            ("Fast-Forward Until Day:", "fast_forward_until"),
+            ("Render Workers (0 = none):", "render_workers"),
+            ("Frame File (optional):", "frame_file"),
+            ("Frame Compression (1-9):", "frame_level"),
+            ("When Settled (stop/cheap/off):", "end_action"),
+            ("Memory Report Every N Steps:", "memory_every"),
+            ("Memory Budget MB (optional):", "memory_budget_mb"),
+            ("Over Budget (warn/abort):", "memory_action"),
         ]
 
         for idx, (label_text, entry_name) in enumerate(additional_fields):
@@ -718,6 +1088,7 @@ class DNADialog:
         *****************************
 
         To switch between the DISPLAY_TYPE use keyboard letters "c", "e", "s" for COLOR, ENERGY, SOIL.
+        Large sectors open zoomed out: pan with the arrow keys or by dragging, zoom with "+", "-" or the mouse wheel, "f" fits the whole sector.
 
         GUI Inputs:
         - Border Width: Adjusts the width of the border between living sectors.
@@ -747,6 +1118,16 @@ class DNADialog:
         - Age Increase: Specifies the rate at which organism age increases.
         - Freeze: Determines whether the simulation is frozen or active.
         - Display Type: Specifies the type of display used in the simulation.
+        - Telemetry Port: Serves live metrics (/metrics) and a frame preview (/preview.png) on localhost while the game runs. Leave empty to disable.
+        - Replay File: Records a compact replay (e.g. run.cevr) that can be played back with any display type in website/index.html.
+        - Lineage Log: Records the parent, step, family, type and DNA mutation of every birth into a folder (e.g. run.lineage); python -m tools.lineage summarizes it and traces the ancestors and descendants of a cell.
+        - Steps per Frame: Simulation steps per frame at the Tick rate. 0 adapts it to the most steps that still keep the window at its refresh rate; "]" and "[" double or halve it while running (and turn the adapting off).
+        - Save Every N Steps / Save FPS: Saves a frame every N steps, or a steady number of frames per second of running time when Save FPS is set.
+        - Fast-Forward Until Day: Skips the early days at full speed, nothing is saved before this day.
+        - Render Workers: Number of processes that draw and save the frames, so saving many frames keeps up with the simulation. 0 saves them from the game window.
+        - Frame File / Frame Compression: Saves the frames into one compact file (e.g. run.cevf) of palette-indexed cells instead of a folder of PNGs; the video is made from it at the end.
+        - When Settled: What happens once every family died out or nothing changes any more: "stop" ends the run, "cheap" runs on to the end at full speed without saving frames, "off" (the default here) never checks. Nothing changes means the population and the mean soil and energy levels stayed within 1% for 200 steps. Queued runs (tools.jobs) stop by default. The reason is written to outcome.json in the output folder.
+        - Memory Report Every N Steps / Memory Budget: Prints the process memory, the Life and DNA objects (on the grid and kept alive off it), the grid and frame buffer sizes and the top allocating lines every N steps (0 is off). Past the budget it warns, or ends the run with "abort".
 
         *****************************
 
@@ -779,6 +1160,27 @@ class DNADialog:
             freeze = float(self.freeze_entry.get())
             soil_released = float(self.soil_released_entry.get())
             display_type = self.display_type_var.get()
+            telemetry_port = self.telemetry_port_entry.get().strip()
+            telemetry_port = int(telemetry_port) if telemetry_port else None
+            replay_path = self.replay_path_entry.get().strip() or None
+            lineage_path = self.lineage_path_entry.get().strip() or None
+            steps_per_frame = int(self.steps_per_frame_entry.get())
+            save_every = int(self.save_every_entry.get())
+            save_fps = self.save_fps_entry.get().strip()
+            save_fps = float(save_fps) if save_fps else None
+            fast_forward_until = int(self.fast_forward_until_entry.get())
+            render_workers = int(self.render_workers_entry.get())
+            frame_file = self.frame_file_entry.get().strip() or None
+            frame_level = int(self.frame_level_entry.get())
+            end_action = self.end_action_entry.get().strip().lower()
+            if end_action not in ("stop", "cheap", "off"):
+                raise ValueError(end_action)
+            memory_every = int(self.memory_every_entry.get())
+            memory_budget_mb = self.memory_budget_mb_entry.get().strip()
+            memory_budget_mb = float(memory_budget_mb) if memory_budget_mb else None
+            memory_action = self.memory_action_entry.get().strip().lower()
+            if memory_action not in ("warn", "abort"):
+                raise ValueError(memory_action)
             
             kwargs = {
                 'mutation_rate': mutation_rate,
@@ -800,7 +1202,21 @@ class DNADialog:
                 'soil_released': soil_released,
                 'age_increase': age_increase,
                 'freeze': freeze,
-                'display_type': display_type
+                'display_type': display_type,
+                'telemetry_port': telemetry_port,
+                'replay_path': replay_path,
+                'lineage_path': lineage_path,
+                'steps_per_frame': steps_per_frame,
+                'save_every': save_every,
+                'save_fps': save_fps,
+                'fast_forward_until': fast_forward_until,
+                'render_workers': render_workers,
+                'frame_file': frame_file,
+                'frame_level': frame_level,
+                'end_action': end_action,
+                'memory_every': memory_every,
+                'memory_budget_mb': memory_budget_mb,
+                'memory_action': memory_action
             }
 
             self.master.destroy()
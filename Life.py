@@ -14,12 +14,17 @@ class DNA:
         for dna_field_name in Constants.fields:
             self.data[dna_field_name] = kwargs.get(dna_field_name, 0.5)
 
-    def mutate(self) -> None:
+    def mutate(self):
+        ''' Maybe Shift One Field, Returns (field index, shift) or None '''
+
         if random.random() < self.data['mutation_rate']:
             mutation_choice = random.choice(list(Constants.fields))
 
             shift = random.uniform(-0.001, 0.001)
             self.data[mutation_choice] += shift
+            return Constants.fields.index(mutation_choice), shift
+
+        return None
 
     def generate_random(self) -> None:
         ''' Randomize DNA '''
@@ -28,9 +33,14 @@ class DNA:
 
 
 class Life:
+    code = Constants.EMPTY
     check_occupied = None
     check_position = None
     private_func = None
+    lineage = None
+
+    # Row of the life in the lineage log (tools/lineage.py), -1 unlogged
+    uid = -1
 
     def __init__(self, family_idx):
         self.family_idx = family_idx
@@ -60,32 +70,47 @@ class Life:
     def set_gridpos_function(cls, check_position):
         cls.check_position = check_position
 
+    @classmethod
+    def set_lineage_log(cls, lineage):
+        cls.lineage = lineage
+
+
+# Leaf, Root and Radio Energy is Harvested
+# by the Sector in One Whole-Grid Pass per Step
 
 class Leaf(Life):
+    code = Constants.LEAF
+
     def __init__(self, idx):
         super().__init__(idx)
         self.color = Constants.GREEN
 
     def execute(self):
-        self.private_func()
+        pass
 
 class Root(Life):
+    code = Constants.ROOT
+
     def __init__(self, idx):
         super().__init__(idx)
         self.color = Constants.BROWN
     
     def execute(self):
-        self.private_func()
+        pass
 
 class Radio(Life):
+    code = Constants.RADIO
+
     def __init__(self, idx):
         super().__init__(idx)
         self.color = Constants.BLUE
     
     def execute(self):
-        self.private_func()
+        pass
 
 class Pipe(Life):
+    code = Constants.PIPE
+
     def __init__(self, idx):
         super().__init__(idx)
         self.color = Constants.COLONIES_COLOR[self.family_idx]
@@ -95,6 +120,8 @@ class Pipe(Life):
 
 
 class Newborn(Life):
+    code = Constants.NEWBORN
+
     def __init__(self, idx, dna=None):
         super().__init__(idx)
         self.color = Constants.WHITE
@@ -126,12 +153,18 @@ class Newborn(Life):
         new_cell.lifelen = np.exp(energy_dist) * Constants.LIFELENGTH
         new_cell.direction = direction
         new_cell.dna = self.dna
-        new_cell.dna.mutate()
+        delta = new_cell.dna.mutate()
 
         if replace:
             direction = 0
 
-        self.private_func(direction, new_cell, idx)
+        placed = self.private_func(direction, new_cell, idx) is not None
+
+        # The family DNA shifted even when the birth found no room, keep that shift too
+        if self.lineage and (placed or delta):
+            uid = self.lineage.record(self.uid, new_cell, delta, placed)
+            if placed:
+                new_cell.uid = uid
 
     def execute(self):
         curr_x, curr_y = self.check_position()
@@ -0,0 +1,66 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Imports
+import collections
+
+import numpy as np
+
+import Constants
+
+# Reasons a Run Ends
+EXTINCTION = "extinction"
+DOMINANCE = "dominance"
+STEADY = "steady state"
+FINISHED = "finished"
+MEMORY = "memory budget"
+
+
+class EndDetector:
+    ''' Tells when a Run has Nothing Left to Show
+
+        Called once per step with the Sector, it returns the reason to end
+        the run (or None): every family died out, a single family is left
+        of several, or the per-family populations and the mean soil and
+        energy all stayed within a tolerance over the last window of steps.
+
+        Only Newborns reproduce, so a family without any is counted as
+        dead: its other cells can only age away. '''
+
+    def __init__(self, reasons=Constants.END_ON,
+                 window=Constants.STEADY_WINDOW, tolerance=Constants.STEADY_TOLERANCE):
+        self.reasons = set(reasons)
+        self.window = window
+        self.tolerance = tolerance
+
+        self.history = collections.deque(maxlen=window)
+        self.most_alive = 0
+        self.detail = ""
+
+    def update(self, sector):
+        population = np.asarray(sector.population)
+        growing = np.asarray(sector.newborn_population)
+        alive = int((growing > 0).sum())
+        self.most_alive = max(self.most_alive, alive)
+
+        if EXTINCTION in self.reasons and alive == 0:
+            self.detail = f"every family died out by day {sector.day_counter}"
+            return EXTINCTION
+
+        if DOMINANCE in self.reasons and alive == 1 and self.most_alive > 1:
+            self.detail = f"family {int(growing.argmax())} is the last one alive on day {sector.day_counter}"
+            return DOMINANCE
+
+        if STEADY in self.reasons and self.window:
+            self.history.append(np.concatenate((population, [sector.world.mean("organic"), sector.world.mean("energy")])))
+
+            if len(self.history) == self.window:
+                history = np.array(self.history)
+                spread = history.max(axis=0) - history.min(axis=0)
+                scale = np.maximum(np.abs(history.mean(axis=0)), 1e-9)
+
+                if (spread <= self.tolerance * scale).all():
+                    self.detail = f"populations and fields unchanged for {self.window} steps by day {sector.day_counter}"
+                    return STEADY
+
+        return None
@@ -0,0 +1,330 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Imports
+import math
+import numpy as np
+
+import Constants
+from tools.lazy_import import lazy_module
+
+pygame = lazy_module("pygame")
+
+# Colors of the Life Types (Pipes take the Family Color)
+LIFE_COLORS = {
+    Constants.LEAF: Constants.GREEN,
+    Constants.ROOT: Constants.BROWN,
+    Constants.RADIO: Constants.BLUE,
+    Constants.NEWBORN: Constants.WHITE,
+}
+
+
+class Camera:
+    ''' Pan & Zoom over the World
+
+        (x, y) is the top-left visible cell, zoom the pixels per cell.
+        Below one pixel per cell the view switches to blocks of cells. '''
+
+    def __init__(self, world_shape, screen_size, zoom=Constants.CELL_SIZE):
+        self.world_shape = world_shape
+        self.screen_size = screen_size
+
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom = zoom
+
+        if world_shape[0] * zoom > screen_size[0] or world_shape[1] * zoom > screen_size[1]:
+            self.fit()
+        self.clamp()
+
+    def min_zoom(self) -> float:
+        ''' Zoom that Shows the Whole World '''
+
+        return min(self.screen_size[0] / self.world_shape[0], self.screen_size[1] / self.world_shape[1])
+
+    def fit(self) -> None:
+        self.zoom = min(self.min_zoom(), Constants.MAX_ZOOM)
+        self.x = self.y = 0.0
+
+    def pan(self, dx, dy) -> None:
+        ''' Move by a Shift in Screen Pixels '''
+
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self.clamp()
+
+    def zoom_at(self, factor, pos) -> None:
+        ''' Zoom Keeping the Cell under the Screen Position in Place '''
+
+        px, py = pos
+        cx, cy = self.x + px / self.zoom, self.y + py / self.zoom
+
+        self.zoom = min(max(self.zoom * factor, self.min_zoom()), Constants.MAX_ZOOM)
+        self.x, self.y = cx - px / self.zoom, cy - py / self.zoom
+        self.clamp()
+
+    def clamp(self) -> None:
+        span_x = self.screen_size[0] / self.zoom
+        span_y = self.screen_size[1] / self.zoom
+
+        self.x = min(max(self.x, 0.0), max(0.0, self.world_shape[0] - span_x))
+        self.y = min(max(self.y, 0.0), max(0.0, self.world_shape[1] - span_y))
+
+    def view(self) -> tuple:
+        ''' Visible Cell Range (i0, i1, j0, j1) and Cells per Block Side '''
+
+        # Power-of-two blocks so samples split evenly between blocks
+        block = 1
+        if self.zoom < 1:
+            block = 2 ** math.ceil(math.log2(1 / self.zoom))
+
+        i0 = int(self.x // block) * block
+        j0 = int(self.y // block) * block
+        i1 = min(self.world_shape[0], math.ceil(self.x + self.screen_size[0] / self.zoom))
+        j1 = min(self.world_shape[1], math.ceil(self.y + self.screen_size[1] / self.zoom))
+
+        return i0, i1, j0, j1, block
+
+
+class Frame:
+    ''' Picture of the Visible Part of a Sector, Detached from the Simulation
+
+        Layers cover the view cell by cell, or block by block when zoomed
+        out (dominant family and mean fields, no type or direction). '''
+
+    def __init__(self, view, layers, stats):
+        self.view = view
+        self.layers = layers
+        self.stats = stats
+
+
+def capture(world, view, stats) -> Frame:
+    ''' Copy the Layers Needed to Draw the View '''
+
+    i0, i1, j0, j1, block = view
+
+    if block == 1:
+        layers = {name: world.window(name, i0, i1, j0, j1)
+                  for name in ("type", "family", "direction", "organic", "energy")}
+    else:
+        layers = aggregate(world, view, len(stats["family_count"]))
+
+    return Frame(view, layers, stats)
+
+
+def aggregate(world, view, families) -> dict:
+    ''' Dominant Family & Mean Fields per Block
+
+        Fields are averaged from at most LOD_SAMPLES x LOD_SAMPLES cells
+        per block, so their cost follows the screen size. Families are
+        counted exactly, but only inside the chunks that hold life. '''
+
+    i0, i1, j0, j1, block = view
+    step = block // min(block, Constants.LOD_SAMPLES)
+    per = block // step
+
+    blocks_x = -(-(i1 - i0) // block)
+    blocks_y = -(-(j1 - j0) // block)
+    families = max(families, 1)
+
+    def sampled(name):
+        values = world.sample(name, i0, i1, j0, j1, step)
+        if values.shape != (blocks_x * per, blocks_y * per):
+            full = np.full((blocks_x * per, blocks_y * per), world.defaults[name], dtype=values.dtype)
+            full[:values.shape[0], :values.shape[1]] = values
+            values = full
+        return values.reshape(blocks_x, per, blocks_y, per).transpose(0, 2, 1, 3).reshape(blocks_x, blocks_y, per * per)
+
+    # Dominant family by one bincount over (block, family) pairs
+
+    keys = []
+    for chunk in world.chunks.values():
+        if not chunk.alive:
+            continue
+
+        ci0, cj0 = chunk.origin
+        a0, a1 = max(i0, ci0), min(i1, ci0 + chunk.shape[0])
+        b0, b1 = max(j0, cj0), min(j1, cj0 + chunk.shape[1])
+        if a0 >= a1 or b0 >= b1:
+            continue
+
+        family = chunk.family[a0 - ci0:a1 - ci0, b0 - cj0:b1 - cj0]
+        xs, ys = np.nonzero(family >= 0)
+        blocks = ((xs + a0 - i0) // block) * blocks_y + (ys + b0 - j0) // block
+        keys.append(blocks * families + family[xs, ys])
+
+    counts = np.zeros(blocks_x * blocks_y * families, dtype=np.int64)
+    if keys:
+        counts = np.bincount(np.concatenate(keys), minlength=counts.size)
+    counts = counts.reshape(blocks_x, blocks_y, families)
+
+    dominant = np.where(counts.max(axis=-1) > 0, counts.argmax(axis=-1), -1)
+
+    return {
+        "family": dominant,
+        "organic": sampled("organic").mean(axis=-1),
+        "energy": sampled("energy").mean(axis=-1),
+    }
+
+
+# Drawing
+
+# Palette: Fixed Colors, Soil & Energy Ramps, then the Family Colors of the Run
+BG_INDEX, ORGANIC_INDEX, ENERGIC_INDEX = 0, 1, 2
+TYPE_INDEX = {Constants.LEAF: 3, Constants.ROOT: 4, Constants.RADIO: 5, Constants.NEWBORN: 6}
+SOIL_INDEX = 7
+ENERGY_INDEX = SOIL_INDEX + Constants.PALETTE_LEVELS
+FAMILY_INDEX = ENERGY_INDEX + Constants.PALETTE_LEVELS
+MAX_FAMILIES = 256 - FAMILY_INDEX
+
+
+def palette(family_colors) -> np.ndarray:
+    ''' RGB Palette of Every Color a Frame can Hold (at most 256) '''
+
+    levels = np.linspace(0, 1, Constants.PALETTE_LEVELS)
+
+    soil = np.zeros((len(levels), 3))
+    soil[:, 0] = 255
+    soil[:, 1] = 255 - 255 * levels
+
+    # Energy color based on organic level
+    energy = np.zeros((len(levels), 3))
+    energy[:, 0] = energy[:, 1] = np.where(levels < 0.5, 255 * levels * 2, 255 * (1 - levels))
+    energy[:, 2] = np.where(levels < 0.5, 255 * (1 - levels), 255 * (1 - levels) * 2)
+
+    fixed = [Constants.BG, Constants.ORGANIC_TOXIC, Constants.ENERGIC_TOXIC,
+             Constants.GREEN, Constants.BROWN, Constants.BLUE, Constants.WHITE]
+    families = list(family_colors[:MAX_FAMILIES])
+
+    colors = np.concatenate([np.array(fixed, dtype=float), soil, energy, np.array(families, dtype=float).reshape(-1, 3)])
+    return np.clip(colors, 0, 255).astype(np.uint8)
+
+
+def field_indices(frame, display_type, fill_life) -> np.ndarray:
+    ''' Palette Index per Cell / Block [x, y] for the Display Type '''
+
+    layers = frame.layers
+    organic = layers["organic"]
+    indices = np.zeros(organic.shape, dtype=np.uint8)
+
+    if display_type == "color":
+
+        # Toxic cells without life, energy drawn over soil
+
+        if "type" in layers:
+            empty = layers["type"] == Constants.EMPTY
+        else:
+            empty = layers["family"] < 0
+
+        indices[empty & (organic > Constants.ORGANIC_THRESHOLD)] = ORGANIC_INDEX
+        indices[empty & (layers["energy"] > Constants.ENERGY_THRESHOLD)] = ENERGIC_INDEX
+
+        if fill_life:
+            family = layers["family"][~empty].astype(np.int64)
+            indices[~empty] = np.where((family >= 0) & (family < MAX_FAMILIES), FAMILY_INDEX + family, TYPE_INDEX[Constants.NEWBORN])
+
+            if "type" in layers:
+                for code, index in TYPE_INDEX.items():
+                    indices[layers["type"] == code] = index
+
+    elif display_type in ("soil", "energy"):
+        levels = np.rint(np.clip(organic, 0, 1) * (Constants.PALETTE_LEVELS - 1)).astype(np.uint8)
+        indices[:] = levels + (SOIL_INDEX if display_type == "soil" else ENERGY_INDEX)
+
+    return indices
+
+
+def field_colors(frame, display_type, fill_life) -> np.ndarray:
+    ''' RGB per Cell / Block [x, y] for the Display Type '''
+
+    return palette(frame.stats["family_colors"])[field_indices(frame, display_type, fill_life)]
+
+
+def draw_life(surface, frame, camera) -> None:
+    ''' Draws Every Living Cell in the View by its Type Shape '''
+
+    i0, _, j0, _, _ = frame.view
+    size = int(camera.zoom)
+    half = size // 2
+    family_colors = frame.stats["family_colors"]
+
+    types, families, directions = frame.layers["type"], frame.layers["family"], frame.layers["direction"]
+
+    for i, j in zip(*np.nonzero(types)):
+        code = types[i, j]
+        direction = directions[i, j]
+        x = int(round((i0 + i - camera.x) * camera.zoom))
+        y = int(round((j0 + j - camera.y) * camera.zoom))
+
+        if code == Constants.LEAF:
+
+            # Draw Instance of the Leaf
+
+            if direction % 2 == 0:
+                pygame.draw.ellipse(surface, Constants.GREEN, (x + size // 4, y, half, size * 1.05), 0)
+            else:
+                pygame.draw.ellipse(surface, Constants.GREEN, (x, y + size // 4, size * 1.05, half), 0)
+
+        elif code == Constants.ROOT or code == Constants.RADIO:
+            pygame.draw.circle(surface, LIFE_COLORS[code], (x + half, y + half), half, 0)
+
+        elif code == Constants.NEWBORN:
+            pygame.draw.circle(surface, Constants.WHITE, (x + half, y + half), half, 1)
+
+        elif code == Constants.PIPE:
+
+            # Draw Instance of the Pipe
+
+            pipe_size = half
+            offset = (size - pipe_size) // 2
+            thickness = max(1, pipe_size // 4)
+            color = family_colors[families[i, j]]
+
+            if direction % 2 == 0:
+                pygame.draw.rect(surface, color, (x + offset, y + offset, thickness, size), 0)
+            else:
+                pygame.draw.rect(surface, color, (x + offset, y + offset, size, thickness), 0)
+
+
+_font = None
+
+def draw_board(surface, stats) -> None:
+    ''' General Survival Information Board '''
+
+    global _font
+    if _font is None:
+        _font = pygame.font.SysFont(None, 20)
+
+    ftext = _font.render("Family Count: " + str(sum(stats["family_count"])), True, Constants.WHITE)
+    ntext = _font.render("Newborn Cell Count: " + str(stats["newborn_count"]), True, Constants.WHITE)
+
+    ftext_rect = ftext.get_rect()
+    ftext_rect.topleft = (10, 24)
+    pygame.draw.rect(surface, (0, 0, 0), ftext_rect)
+    surface.blit(ftext, ftext_rect)
+
+    ntext_rect = ntext.get_rect()
+    ntext_rect.topleft = (10, 10)
+    pygame.draw.rect(surface, (0, 0, 0), ntext_rect)
+    surface.blit(ntext, ntext_rect)
+
+
+def draw(surface, frame, camera, display_type) -> None:
+    ''' Draws a Captured Frame where the Camera Currently Looks '''
+
+    i0, _, j0, _, block = frame.view
+    detailed = display_type == "color" and block == 1 and camera.zoom >= Constants.DETAIL_ZOOM
+
+    if display_type in ("color", "soil", "energy"):
+        colors = field_colors(frame, display_type, fill_life=not detailed)
+        image = pygame.surfarray.make_surface(colors)
+
+        scale = block * camera.zoom
+        size = (max(1, round(colors.shape[0] * scale)), max(1, round(colors.shape[1] * scale)))
+        offset = (round((i0 - camera.x) * camera.zoom), round((j0 - camera.y) * camera.zoom))
+        surface.blit(pygame.transform.scale(image, size), offset)
+
+    if detailed:
+        draw_life(surface, frame, camera)
+
+    draw_board(surface, frame.stats)
@@ -0,0 +1,157 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Imports
+import queue
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import Render
+import Constants
+
+# Layers of a Frame as Stored in a Ring Slot (fields in float32, enough for colors)
+SLOT_LAYERS = {
+    "type": np.int8,
+    "family": np.int16,
+    "direction": np.int8,
+    "organic": np.float32,
+    "energy": np.float32,
+}
+
+
+def slot_arrays(buffer, slot, capacity, shapes) -> dict:
+    ''' Views of the Layers of One Ring Slot, Shaped like the Frame Layers '''
+
+    slot_bytes = capacity * sum(np.dtype(dtype).itemsize for dtype in SLOT_LAYERS.values())
+    offset = slot * slot_bytes
+
+    arrays = {}
+    for name, dtype in SLOT_LAYERS.items():
+        if name in shapes:
+            arrays[name] = np.ndarray(shapes[name], dtype=dtype, buffer=buffer, offset=offset)
+        offset += capacity * np.dtype(dtype).itemsize
+
+    return arrays
+
+
+def render_worker(name, capacity, surface_size, tasks, free) -> None:
+    ''' Turns Frames from the Ring into PNG Files until it Gets None '''
+
+    import pygame
+    pygame.font.init()
+
+    memory = shared_memory.SharedMemory(name=name)
+    surface = pygame.Surface(surface_size)
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+
+            slot, shapes, view, stats, camera, display_type, path = task
+            error = None
+            try:
+                layers = {key: array.copy() for key, array in slot_arrays(memory.buf, slot, capacity, shapes).items()}
+                surface.fill(Constants.BG)
+                Render.draw(surface, Render.Frame(view, layers, stats), camera, display_type)
+                pygame.image.save(surface, path)
+            except Exception as exception:
+                error = f"{path}: {exception!r}"
+
+            free.put((slot, error))
+    finally:
+        del surface
+        memory.close()
+
+
+class RenderPool:
+    ''' Worker Processes that Draw and Save Frames from a Shared-Memory Ring
+
+        The simulation copies the layers of each frame into a free slot of
+        one shared block and queues only the small description of the slot
+        (view, counters, camera). No Cell or Life object is ever pickled.
+        Saving scales with the number of workers; the steps only wait when
+        every slot is still being drawn. '''
+
+    def __init__(self, workers, surface_size, slots=Constants.RENDER_SLOTS):
+        self.surface_size = surface_size
+        self.slots = slots
+
+        # At one pixel per cell or less a view never holds more cells than pixels (+ partial cells)
+        self.capacity = (surface_size[0] + 2) * (surface_size[1] + 2)
+        slot_bytes = self.capacity * sum(np.dtype(dtype).itemsize for dtype in SLOT_LAYERS.values())
+        self.memory = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+
+        context = multiprocessing.get_context("spawn")
+        self.tasks = context.Queue()
+        self.free = context.Queue()
+        for slot in range(slots):
+            self.free.put((slot, None))
+
+        self.workers = [
+            context.Process(target=render_worker, name=f"render-{idx}", daemon=True,
+                            args=(self.memory.name, self.capacity, surface_size, self.tasks, self.free))
+            for idx in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+        self.errors = []
+
+    def acquire(self, timeout=None):
+        ''' Index of a Free Slot, None if None Freed Up in Time
+
+            Raises once a worker died (crash, out of memory, import error):
+            the slot it held never comes back and the run would wait forever.
+            Checked on every call, the other workers may keep slots coming. '''
+
+        self.check_workers()
+        try:
+            slot, error = self.free.get(timeout=timeout)
+        except queue.Empty:
+            self.check_workers()
+            return None
+
+        if error:
+            self.errors.append(error)
+        return slot
+
+    def check_workers(self) -> None:
+        for worker in self.workers:
+            if not worker.is_alive():
+                raise RuntimeError(f"Render worker {worker.name} exited with code {worker.exitcode}")
+
+    def submit(self, slot, frame, camera, display_type, path) -> None:
+        ''' Copy a Frame into an Acquired Slot and Queue it for Saving '''
+
+        shapes = {name: array.shape for name, array in frame.layers.items()}
+        for name, array in slot_arrays(self.memory.buf, slot, self.capacity, shapes).items():
+            array[...] = frame.layers[name]
+
+        self.tasks.put((slot, shapes, frame.view, frame.stats, camera, display_type, path))
+
+    def close(self) -> None:
+        ''' Let the Workers Finish the Queued Frames, then Free the Ring '''
+
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join()
+
+        # Workers are gone by now, collect the errors of the frames they saved
+        while True:
+            try:
+                _, error = self.free.get_nowait()
+            except queue.Empty:
+                break
+            if error:
+                self.errors.append(error)
+
+        self.memory.close()
+        self.memory.unlink()
+
+        for error in self.errors:
+            print("Frame not saved:", error)
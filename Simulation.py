@@ -0,0 +1,214 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Imports
+import os
+import copy
+import time
+import queue
+import threading
+
+import Outcome
+import Constants
+
+
+class Simulation:
+    ''' Runs the Sector Steps on a Worker Thread
+
+        The GUI never touches the Sector while it runs. The worker hands
+        over immutable Frames instead: the latest one when the GUI asks for
+        a picture (so capturing costs at most one copy per drawn frame), and
+        every frame due for saving through a bounded queue, or straight to
+        the render worker processes. Stepping never waits for drawing, only
+        for a full save queue or ring. '''
+
+    def __init__(self, sector, camera, pacer, saver, recorder=None, monitor=None,
+                 fast_forward_until=0, finish=None, render_pool=None, folder=None, frame_writer=None,
+                 detector=None, end_action="stop", memory_watch=None):
+        self.sector = sector
+        # Own copy of the camera, replaced (never changed) by set_camera
+        self.camera = copy.copy(camera)
+        self.pacer = pacer
+        self.saver = saver
+        self.recorder = recorder
+        self.monitor = monitor
+        self.fast_forward_until = fast_forward_until
+        self.finish = Constants.FINISH if finish is None else finish
+
+        # Frames due for saving go to the render workers when given, else to the
+        # save queue, drawn to PNGs or written to the frame file by the GUI loop
+        self.render_pool = render_pool
+        self.folder = folder
+        # Only measured here, the GUI loop encodes and compresses into it
+        self.frame_writer = frame_writer
+
+        # On extinction, dominance or a steady state either stop, or keep
+        # going in a cheap mode (full speed, nothing recorded or saved)
+        self.detector = detector
+        self.end_action = end_action
+        self.cheap = False
+
+        # Periodic memory reports, ends the run past an "abort" budget
+        self.memory_watch = memory_watch
+
+        self.step_count = 0
+        self.finished = False
+        self.error = None
+
+        # Latest frame slot, swapped under the lock
+        self.lock = threading.Lock()
+        self.frame = None
+        self.frame_wanted = threading.Event()
+        self.frame_wanted.set()
+
+        self.saved = queue.Queue(maxsize=Constants.SAVE_QUEUE)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="sector-simulation", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def set_camera(self, camera) -> None:
+        ''' Hand Over the Camera as it is Now, the GUI Keeps Moving its Own '''
+
+        camera = copy.copy(camera)
+        with self.lock:
+            self.camera = camera
+
+    def run(self) -> None:
+        try:
+            self.loop()
+        except Exception as error:
+            self.error = error
+        finally:
+            self.finished = True
+
+    def loop(self) -> None:
+        sector = self.sector
+        next_step = time.perf_counter()
+
+        while not self.stopped.is_set():
+            step_started = time.perf_counter()
+            sector.step()
+            self.step_count += 1
+            self.pacer.record_step(time.perf_counter() - step_started)
+
+            with self.lock:
+                camera = self.camera
+
+            last = sector.day_counter > self.finish
+            if last and not sector.end_reason:
+                sector.end_reason = Outcome.FINISHED
+
+            if self.detector and not sector.end_reason:
+                sector.end_reason = self.detector.update(sector)
+                if sector.end_reason:
+                    last = self.end_action != "cheap"
+                    self.cheap = not last
+
+            if self.memory_watch and self.memory_watch.due(sector.step_count):
+                self.memory_watch.check(sector, self.buffer_sizes())
+                if self.memory_watch.abort:
+                    sector.end_reason = Outcome.MEMORY
+                    last = True
+
+            if self.recorder and not self.cheap:
+                self.recorder.write_sector(sector)
+            if self.monitor:
+                self.monitor.publish(sector.day_counter, sector.population, sector.newborn_count)
+
+            if not self.cheap and self.saver.due(self.step_count, sector.day_counter):
+                self.put_saved(sector.capture(camera), camera)
+
+            if self.frame_wanted.is_set() or last:
+                self.frame_wanted.clear()
+                frame = sector.capture(camera)
+                with self.lock:
+                    self.frame = frame
+
+            if last:
+                break
+
+            # Full speed while fast-forwarding, else capped by the pacer
+
+            if self.cheap or (self.fast_forward_until and sector.day_counter < self.fast_forward_until):
+                next_step = time.perf_counter()
+                continue
+
+            interval = self.pacer.interval()
+            next_step = max(next_step + interval, time.perf_counter() - interval)
+            delay = next_step - time.perf_counter()
+            if delay > 0:
+                self.stopped.wait(delay)
+
+    def put_saved(self, frame, camera) -> None:
+        ''' Queue a Frame for Saving, Waits only while the Queue is Full '''
+
+        if self.render_pool:
+            filename = str(frame.stats["day_counter"]).zfill(8) + ".png"
+            path = os.path.join(self.folder, filename)
+
+            while not self.stopped.is_set():
+                slot = self.render_pool.acquire(timeout=0.1)
+                if slot is not None:
+                    self.render_pool.submit(slot, frame, camera, self.sector.display_type, path)
+                    return
+            return
+
+        while not self.stopped.is_set():
+            try:
+                self.saved.put((frame, camera), timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def buffer_sizes(self) -> dict:
+        ''' Bytes Held by the Frame & Recording Buffers '''
+
+        sizes = {
+            "save queue": sum(sum(layer.nbytes for layer in frame.layers.values()) for frame, _ in list(self.saved.queue)),
+        }
+
+        frame = self.frame
+        if frame is not None:
+            sizes["latest frame"] = sum(layer.nbytes for layer in frame.layers.values())
+        if self.render_pool:
+            sizes["render ring"] = self.render_pool.memory.size
+        if self.frame_writer:
+            sizes["frame file chunk"] = sum(len(data) for data in self.frame_writer.frames)
+        if self.recorder:
+            sizes["replay chunk"] = self.recorder.buffer_size()
+        if self.sector.lineage:
+            sizes["lineage batch"] = self.sector.lineage.buffer_size()
+
+        return sizes
+
+
+    # GUI Side
+
+    def latest(self):
+        ''' The New Frame since the Last Call (or None), Asks for the Next One '''
+
+        with self.lock:
+            frame, self.frame = self.frame, None
+
+        if frame is not None:
+            self.frame_wanted.set()
+        return frame
+
+    def saved_frames(self) -> list:
+        ''' Frames Due for Saving, in Step Order '''
+
+        frames = []
+        while True:
+            try:
+                frames.append(self.saved.get_nowait())
+            except queue.Empty:
+                return frames
+
+    def done(self) -> bool:
+        return self.finished and self.saved.empty()
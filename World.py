@@ -0,0 +1,343 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Imports
+import numpy as np
+import Constants
+
+
+# Per-cell layers of the grid: name -> dtype
+LAYERS = {
+    "energy": np.float64,
+    "organic": np.float64,
+    "type": np.int8,
+    "family": np.int16,
+    "direction": np.int8,
+}
+
+# Bit b of a bitmap word (bitmaps pack 64 cells of a grid column per uint64)
+BITS = [1 << bit for bit in range(64)]
+CLEAR_BITS = [~(1 << bit) & (2 ** 64 - 1) for bit in range(64)]
+
+# Type codes no other life builds over, as a lookup table of the type map
+BLOCKING_TYPES = [code in Constants.BLOCKING for code in range(Constants.PIPE + 1)]
+
+
+def bitmap_shape(shape) -> tuple:
+    return shape[0], -(-shape[1] // 64)
+
+
+def unpack_bits(bitmap, cols) -> np.ndarray:
+    ''' Packed Occupancy Bitmap to One Bool per Cell '''
+
+    bits = np.unpackbits(np.ascontiguousarray(bitmap).view(np.uint8), axis=1, bitorder="little")
+    return bits[:, :cols].astype(bool)
+
+
+class Chunk:
+    ''' Square Tile of the World Holding One Array per Layer '''
+
+    def __init__(self, key, origin, layers, occupancy=None):
+        self.key = key
+        self.origin = origin
+        self.shape = layers["type"].shape
+
+        for name, array in layers.items():
+            setattr(self, name, array)
+
+        # Occupancy bitmap, bit j % 64 of word [i, j // 64] is cell (i, j);
+        # kept in sync with the type, family and direction layers by place()
+        if occupancy is None:
+            occupancy = np.zeros(bitmap_shape(self.shape), dtype=np.uint64)
+        self.occupancy = occupancy
+
+        # Single cells are read & written through memoryviews of the maps,
+        # several times cheaper than numpy scalar indexing
+        self.maps = tuple(memoryview(array) for array in (self.type, self.family, self.direction, self.occupancy))
+
+        # Settled chunks hold no life and their fields are at rest,
+        # the Sector step loop skips them until they are touched again
+        self.settled = False
+        self.alive = False
+
+    def place(self, idx, life) -> None:
+        ''' Write the Life (or None) of a Cell into the Maps of the Chunk '''
+
+        types, families, directions, occupancy = self.maps
+        i, j = idx
+        word = i, j >> 6
+
+        if life is None:
+            types[idx] = Constants.EMPTY
+            families[idx] = -1
+            directions[idx] = 0
+            occupancy[word] &= CLEAR_BITS[j & 63]
+            return
+
+        types[idx] = life.code
+        families[idx] = life.family_idx
+        directions[idx] = life.direction
+        occupancy[word] |= BITS[j & 63]
+        self.alive = True
+
+    def blocks(self, idx, family_idx) -> bool:
+        ''' Cell Holds Life of the Same Family, or a Type Nothing Builds over
+
+            One byte of the type map is read (cheaper than testing a bit of
+            the occupancy word), the family map only for a living cell. '''
+
+        code = self.maps[0][idx]
+        return BLOCKING_TYPES[code] or (code != Constants.EMPTY and self.maps[1][idx] == family_idx)
+
+    def occupied(self) -> np.ndarray:
+        ''' Occupancy Bitmap Unpacked to One Bool per Cell '''
+
+        return unpack_bits(self.occupancy, self.shape[1])
+
+    def global_keys(self, height) -> np.ndarray:
+        ''' Flat World Index (i * height + j) of Every Cell in the Chunk '''
+
+        i0, j0 = self.origin
+        cols = np.arange(i0, i0 + self.shape[0])
+        rows = np.arange(j0, j0 + self.shape[1])
+        return (cols[:, None] * height + rows[None, :]).ravel()
+
+
+class World:
+    ''' Chunked Grid Storage with Lazily Allocated Chunks and Cells
+
+        Dense worlds keep one backing array per layer, chunks are views
+        into it. Sparse worlds only allocate the chunks that get touched;
+        untouched chunks read as the compact default values. '''
+
+    def __init__(self, shape, cell_factory, init_chunk, defaults, sparse=False, chunk_size=Constants.CHUNK_SIZE):
+        self.shape = shape
+        self.chunk_size = chunk_size
+        self.chunk_counts = (-(-shape[0] // chunk_size), -(-shape[1] // chunk_size))
+        self.sparse = sparse
+
+        self.cell_factory = cell_factory
+        self.init_chunk = init_chunk
+        self.defaults = defaults
+
+        self.chunks = {}
+        # Cells are only created for touched positions, by flat key
+        self.cells = {}
+        # Keys of the chunks settled since the last take_settled()
+        self.settled_keys = set()
+
+        self.backing = None
+        self.occupancy = None
+        if not sparse:
+            self.backing = {name: np.full(shape, defaults[name], dtype=dtype) for name, dtype in LAYERS.items()}
+            # Chunks starting on a word boundary share one whole-grid bitmap
+            if chunk_size % 64 == 0:
+                self.occupancy = np.zeros(bitmap_shape(shape), dtype=np.uint64)
+            for ci in range(self.chunk_counts[0]):
+                for cj in range(self.chunk_counts[1]):
+                    self.chunk(ci, cj)
+
+    def chunk(self, ci, cj) -> Chunk:
+        ''' Get (or Allocate on First Use) the Chunk at Chunk Coordinates '''
+
+        chunk = self.chunks.get((ci, cj))
+        if chunk is not None:
+            return chunk
+
+        size = self.chunk_size
+        i0, j0 = ci * size, cj * size
+        i1, j1 = min(i0 + size, self.shape[0]), min(j0 + size, self.shape[1])
+
+        if self.backing is not None:
+            layers = {name: array[i0:i1, j0:j1] for name, array in self.backing.items()}
+        else:
+            layers = {name: np.full((i1 - i0, j1 - j0), self.defaults[name], dtype=dtype)
+                      for name, dtype in LAYERS.items()}
+
+        occupancy = None
+        if self.occupancy is not None:
+            occupancy = self.occupancy[i0:i1, j0 // 64:-(-j1 // 64)]
+
+        chunk = Chunk((ci, cj), (i0, j0), layers, occupancy)
+        self.chunks[(ci, cj)] = chunk
+        self.init_chunk(chunk)
+
+        return chunk
+
+    def cell(self, i, j):
+        ''' Get (or Create) the Cell at Grid Index (i, j), Wakes its Chunk '''
+
+        key = i * self.shape[1] + j
+        cell = self.cells.get(key)
+
+        if cell is None:
+            size = self.chunk_size
+            chunk = self.chunk(i // size, j // size)
+            cell = self.cell_factory(i, j, chunk, (i % size, j % size))
+            self.cells[key] = cell
+        else:
+            chunk = cell.chunk
+
+        chunk.settled = False
+        return cell
+
+    def active_chunks(self) -> list:
+        return [chunk for chunk in self.chunks.values() if not chunk.settled]
+
+    def settle(self, chunk) -> None:
+        chunk.settled = True
+        self.settled_keys.add(chunk.key)
+
+    def take_settled(self) -> set:
+        ''' Chunks Settled since the Last Call, they may have Changed before '''
+
+        settled, self.settled_keys = self.settled_keys, set()
+        return settled
+
+    def memory_size(self) -> int:
+        ''' Bytes Held by the Allocated Layer Arrays & Occupancy Bitmaps '''
+
+        if self.occupancy is not None:
+            bitmaps = self.occupancy.nbytes
+        else:
+            bitmaps = sum(chunk.occupancy.nbytes for chunk in self.chunks.values())
+        if self.backing is not None:
+            return bitmaps + sum(array.nbytes for array in self.backing.values())
+
+        return bitmaps + sum(getattr(chunk, name).nbytes for chunk in self.chunks.values() for name in LAYERS)
+
+
+    # Neighbourhood & Whole-Grid Access
+
+    def padded(self, chunk, name) -> np.ndarray:
+        ''' Chunk Layer with a One-Cell Border from its Torus Neighbours '''
+
+        array = getattr(chunk, name)
+        out = np.full((array.shape[0] + 2, array.shape[1] + 2), self.defaults[name], dtype=array.dtype)
+        out[1:-1, 1:-1] = array
+
+        ci, cj = chunk.key
+        ni, nj = self.chunk_counts
+
+        left = self.chunks.get(((ci - 1) % ni, cj))
+        right = self.chunks.get(((ci + 1) % ni, cj))
+        top = self.chunks.get((ci, (cj - 1) % nj))
+        bottom = self.chunks.get((ci, (cj + 1) % nj))
+
+        if left:   out[0, 1:-1] = getattr(left, name)[-1, :]
+        if right:  out[-1, 1:-1] = getattr(right, name)[0, :]
+        if top:    out[1:-1, 0] = getattr(top, name)[:, -1]
+        if bottom: out[1:-1, -1] = getattr(bottom, name)[:, 0]
+
+        return out
+
+    def window(self, name, i0, i1, j0, j1) -> np.ndarray:
+        ''' Copy of a Layer over Grid Ranges [i0, i1) x [j0, j1), Without Allocating '''
+
+        if self.backing is not None:
+            return self.backing[name][i0:i1, j0:j1].copy()
+
+        out = np.full((i1 - i0, j1 - j0), self.defaults[name], dtype=LAYERS[name])
+        size = self.chunk_size
+
+        for ci in range(i0 // size, -(-i1 // size)):
+            for cj in range(j0 // size, -(-j1 // size)):
+                chunk = self.chunks.get((ci, cj))
+                if chunk is None:
+                    continue
+
+                ci0, cj0 = chunk.origin
+                a0, a1 = max(i0, ci0), min(i1, ci0 + chunk.shape[0])
+                b0, b1 = max(j0, cj0), min(j1, cj0 + chunk.shape[1])
+                out[a0 - i0:a1 - i0, b0 - j0:b1 - j0] = getattr(chunk, name)[a0 - ci0:a1 - ci0, b0 - cj0:b1 - cj0]
+
+        return out
+
+    def sample(self, name, i0, i1, j0, j1, step) -> np.ndarray:
+        ''' Layer Values at Every step-th Cell of a Range, Without Allocating
+
+            Only allocated chunks are visited, so the cost follows the
+            number of samples and chunks in memory, not the range area. '''
+
+        if self.backing is not None:
+            return self.backing[name][i0:i1:step, j0:j1:step].copy()
+
+        out = np.full((-(-(i1 - i0) // step), -(-(j1 - j0) // step)), self.defaults[name], dtype=LAYERS[name])
+
+        for chunk in self.chunks.values():
+            ci0, cj0 = chunk.origin
+            a0, a1 = max(i0, ci0), min(i1, ci0 + chunk.shape[0])
+            b0, b1 = max(j0, cj0), min(j1, cj0 + chunk.shape[1])
+            if a0 >= a1 or b0 >= b1:
+                continue
+
+            # First sampled row / column inside the chunk
+            ka, kb = -(-(a0 - i0) // step), -(-(b0 - j0) // step)
+            sa, sb = i0 + ka * step, j0 + kb * step
+            if sa >= a1 or sb >= b1:
+                continue
+
+            values = getattr(chunk, name)[sa - ci0:a1 - ci0:step, sb - cj0:b1 - cj0:step]
+            out[ka:ka + values.shape[0], kb:kb + values.shape[1]] = values
+
+        return out
+
+    def mean(self, name) -> float:
+        ''' Layer Mean over the Whole World, Unallocated Chunks at their Default '''
+
+        if self.backing is not None:
+            return float(self.backing[name].mean())
+
+        total = sum(float(getattr(chunk, name).sum()) for chunk in self.chunks.values())
+        allocated = sum(chunk.shape[0] * chunk.shape[1] for chunk in self.chunks.values())
+        cells = self.shape[0] * self.shape[1]
+
+        return (total + self.defaults[name] * (cells - allocated)) / cells
+
+    def bitmap(self) -> np.ndarray:
+        ''' Whole-Grid Occupancy Bitmap: the Shared One Itself if Dense, a Copy Otherwise '''
+
+        if self.occupancy is not None:
+            return self.occupancy
+
+        out = np.zeros(bitmap_shape(self.shape), dtype=np.uint64)
+        for chunk in self.chunks.values():
+            ci0, cj0 = chunk.origin
+            words = chunk.occupancy.shape[1]
+            if cj0 % 64 == 0:
+                out[ci0:ci0 + chunk.shape[0], cj0 // 64:cj0 // 64 + words] = chunk.occupancy
+                continue
+
+            # Chunks off a word boundary are repacked bit by bit
+            occupied = np.zeros((chunk.shape[0], out.shape[1] * 64), dtype=bool)
+            occupied[:, cj0:cj0 + chunk.shape[1]] = chunk.occupied()
+            out[ci0:ci0 + chunk.shape[0]] |= np.packbits(occupied, axis=1, bitorder="little").view(np.uint64)
+
+        return out
+
+    def dense(self, name) -> np.ndarray:
+        ''' Whole-Grid Layer: the Backing Array Itself if Dense, a Copy if Sparse '''
+
+        if self.backing is not None:
+            return self.backing[name]
+
+        return self.window(name, 0, self.shape[0], 0, self.shape[1])
+
+    def fill(self, name, i0, i1, j0, j1, value) -> None:
+        ''' Write a Value over Grid Ranges, Allocating the Chunks it Touches '''
+
+        i0, j0 = max(i0, 0), max(j0, 0)
+        i1, j1 = min(i1, self.shape[0]), min(j1, self.shape[1])
+        if i0 >= i1 or j0 >= j1:
+            return
+
+        size = self.chunk_size
+        for ci in range(i0 // size, -(-i1 // size)):
+            for cj in range(j0 // size, -(-j1 // size)):
+                chunk = self.chunk(ci, cj)
+                chunk.settled = False
+
+                ci0, cj0 = chunk.origin
+                a0, a1 = max(i0, ci0), min(i1, ci0 + chunk.shape[0])
+                b0, b1 = max(j0, cj0), min(j1, cj0 + chunk.shape[1])
+                getattr(chunk, name)[a0 - ci0:a1 - ci0, b0 - cj0:b1 - cj0] = value
@@ -0,0 +1,34 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import os
+import sys
+import random
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# No window or sound device is needed by any test
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+@pytest.fixture
+def make_sector():
+    ''' Small Seeded Sector with Life Access Granted '''
+
+    import Life
+    import EvolutionGame
+
+    def make(seed=0, **kwargs):
+        random.seed(seed)
+        config = {"sector_size_x": 160, "sector_size_y": 160, "families_count": 2, **kwargs}
+        EvolutionGame.configure(**config)
+        sector = EvolutionGame.Sector(**config)
+        sector.grant_life_access()
+        return sector
+
+    yield make
+    Life.Life.set_lineage_log(None)
@@ -0,0 +1,41 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import Render
+import Constants
+
+
+def test_large_world_starts_fitted():
+    camera = Render.Camera((4000, 2000), (800, 400))
+
+    assert camera.zoom == 0.2
+    assert camera.view() == (0, 4000, 0, 2000, 8)
+
+
+def zoomed_camera():
+    # Starts fitted at 2 pixels per cell, the whole world in view
+    camera = Render.Camera((100, 100), (200, 200), zoom=4)
+    camera.zoom_at(2, (0, 0))
+    return camera
+
+
+def test_pan_stays_inside_the_world():
+    camera = zoomed_camera()
+
+    camera.pan(-1000, -1000)
+    assert (camera.x, camera.y) == (0.0, 0.0)
+    camera.pan(10000, 10000)
+    assert (camera.x, camera.y) == (50.0, 50.0)
+
+
+def test_zoom_keeps_the_cell_under_the_cursor():
+    camera = zoomed_camera()
+    camera.pan(80, 80)
+
+    cell = camera.x + 100 / camera.zoom, camera.y + 100 / camera.zoom
+    camera.zoom_at(2, (100, 100))
+    assert camera.zoom == min(8, Constants.MAX_ZOOM)
+    assert (camera.x + 100 / camera.zoom, camera.y + 100 / camera.zoom) == cell
+
+    camera.zoom_at(1e-6, (0, 0))
+    assert camera.zoom == camera.min_zoom()
@@ -0,0 +1,56 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import random
+from concurrent.futures import Future
+
+import Constants
+from tools import dna_search
+
+
+class InlinePool:
+    ''' Runs Submitted Calls at Once, in Place of a Process Pool '''
+
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+def test_halving_keeps_the_best(monkeypatch):
+    def score(dna, seed, steps, config):
+        return {"steps": steps, "steps_run": steps, "score": dna["mutation_rate"]}
+
+    monkeypatch.setattr(dna_search, "evaluate", score)
+    search = dna_search.SuccessiveHalving(InlinePool(), {}, eta=3, min_steps=10, max_steps=90,
+                                          rng=random.Random(0))
+
+    candidates = [{"mutation_rate": value / 10} for value in range(9)]
+    results = search.round(candidates)
+
+    # 9 candidates x 10 steps, 3 x 30, 1 x 90
+    assert results == [(0.8, {"mutation_rate": 0.8})]
+    assert search.budget == 9 * 10 + 3 * 30 + 90
+    assert len(search.evaluations) == 13
+
+
+def test_nearby_dna_stays_in_range():
+    rng = random.Random(0)
+    dna = dna_search.random_dna(rng)
+
+    assert set(dna) == set(Constants.fields)
+    for _ in range(20):
+        dna = dna_search.nearby_dna(dna, rng, spread=1)
+        assert all(0 <= value <= 1 for value in dna.values())
+
+
+def test_evaluate_is_seeded():
+    config = {"sector_size_x": 120, "sector_size_y": 120, "families_count": 2}
+    dna = {field: 0.5 for field in Constants.fields}
+
+    first = dna_search.evaluate(dna, 7, 20, config)
+    second = dna_search.evaluate(dna, 7, 20, config)
+
+    assert first == second
+    assert 0 <= first["survival"] <= 1
+    assert first["steps_run"] <= 20
@@ -0,0 +1,39 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import numpy as np
+
+from tools import equivalence
+
+
+def runs(values):
+    return [{"metrics": {"population": value}} for value in values]
+
+
+def test_ks_statistic():
+    assert equivalence.ks_2samp([1, 2, 3], [1, 2, 3]) == (0.0, 1.0)
+
+    distance, p_value = equivalence.ks_2samp(np.arange(50), np.arange(50) + 100)
+    assert distance == 1.0
+    assert p_value < 1e-6
+
+
+def test_compare_needs_a_detectable_and_large_difference():
+    rng = np.random.default_rng(0)
+    reference = rng.normal(1000, 10, 40)
+
+    same, = equivalence.compare(runs(reference), runs(rng.normal(1000, 10, 40)))
+    assert not same["differs"]
+
+    # Detectable, but within the tolerance
+    small, = equivalence.compare(runs(reference), runs(reference + 50))
+    assert small["p_value"] < 0.01 and not small["differs"]
+
+    large, = equivalence.compare(runs(reference), runs(reference * 2))
+    assert large["differs"]
+
+
+def test_compare_skips_missing_values():
+    row, = equivalence.compare(runs([np.nan, np.nan]), runs([1.0, 2.0]))
+
+    assert row["ks"] is None and not row["differs"]
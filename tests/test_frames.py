@@ -0,0 +1,56 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import numpy as np
+
+import Render
+from tools import frames
+
+FAMILY_COLORS = [(255, 0, 0), (0, 0, 255)]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "run.frames")
+    rng = np.random.default_rng(0)
+    written = [rng.integers(0, 8, size=(6, 4), dtype=np.uint8) for _ in range(5)]
+
+    writer = frames.FrameWriter(path, (6, 4), FAMILY_COLORS, chunk_frames=2)
+    for tick, indices in enumerate(written):
+        writer.write(tick, 2, tick * 3, indices, 1.0, (0, 0))
+    writer.close()
+
+    reader = frames.FrameReader(path)
+    decoded = list(reader.frames())
+    assert [tick for tick, *_ in decoded] == list(range(5))
+    for (tick, families, newborns, window), indices in zip(decoded, written):
+        assert (families, newborns) == (2, tick * 3)
+        # Stored [x, y], read back as window rows
+        assert np.array_equal(window, indices.T)
+
+    assert reader.palette.shape == (len(Render.palette(FAMILY_COLORS)), 3)
+
+
+def test_unfinished_file_is_readable(tmp_path):
+    path = str(tmp_path / "run.frames")
+    writer = frames.FrameWriter(path, (2, 2), FAMILY_COLORS, chunk_frames=1)
+    for tick in range(3):
+        writer.write(tick, 1, 0, np.full((2, 2), 3, dtype=np.uint8), 1.0, (0, 0))
+    # No close(): the index and footer are missing
+    writer.file.close()
+
+    assert [tick for tick, *_ in frames.FrameReader(path).frames()] == [0, 1, 2]
+
+
+def test_expand_scales_and_pads(tmp_path):
+    path = str(tmp_path / "run.frames")
+    writer = frames.FrameWriter(path, (6, 4), FAMILY_COLORS)
+    writer.write(0, 1, 0, np.array([[3, 4], [5, 6]], dtype=np.uint8), 2.0, (1, 0))
+    writer.close()
+
+    _, _, _, window = next(frames.FrameReader(path).frames())
+    assert window.shape == (4, 6)
+    # Two pixels per cell, shifted one pixel right, background around
+    assert window[:, 0].tolist() == [Render.BG_INDEX] * 4
+    assert window[0, 1:5].tolist() == [3, 3, 5, 5]
+    assert window[2, 1:5].tolist() == [4, 4, 6, 6]
+    assert window[:, 5].tolist() == [Render.BG_INDEX] * 4
@@ -0,0 +1,126 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import sys
+import asyncio
+
+import pytest
+
+from tools import jobs
+
+
+@pytest.fixture
+def server(tmp_path):
+    return jobs.JobServer(str(tmp_path / "jobs.sqlite"), str(tmp_path / "jobs"), workers=2)
+
+
+def job(server, job_id):
+    return server.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+
+def test_claim_in_order(server, tmp_path):
+    first = jobs.submit(server.db, {"families_count": 2})
+    second = jobs.submit(server.db, {"families_count": 3})
+
+    assert server.claim() == (first, str(tmp_path / "jobs" / str(first)))
+    assert server.claim()[0] == second
+    assert server.claim() is None
+
+    assert job(server, first)["status"] == "running"
+    assert job(server, first)["attempts"] == 1
+    assert (tmp_path / "jobs" / str(first)).is_dir()
+
+
+def test_crash_is_retried_after_a_delay(server, monkeypatch):
+    job_id = jobs.submit(server.db, {}, max_attempts=2)
+
+    server.claim()
+    server.finish(job_id, crashed=True, error="exit code 1")
+    row = job(server, job_id)
+    assert row["status"] == "queued" and row["error"] == "exit code 1"
+
+    # Not due before the retry delay
+    assert server.claim() is None
+    monkeypatch.setattr(jobs.time, "time", lambda: row["not_before"] + 1)
+    assert server.claim()[0] == job_id
+
+    server.finish(job_id, crashed=True)
+    assert job(server, job_id)["status"] == "failed"
+    assert job(server, job_id)["attempts"] == 2
+
+
+def test_done(server):
+    job_id = jobs.submit(server.db, {})
+    server.claim()
+    server.finish(job_id, crashed=False)
+
+    assert job(server, job_id)["status"] == "done"
+    assert job(server, job_id)["progress"] == 1
+
+
+def test_cancel(server):
+    queued = jobs.submit(server.db, {})
+    running = jobs.submit(server.db, {})
+    server.claim()
+
+    # The first job is running now, the second still queued
+    assert jobs.cancel(server.db, queued) == "running"
+    assert jobs.cancel(server.db, running) == "cancelled"
+    assert server.claim() is None
+
+    server.finish(queued, crashed=True)
+    assert job(server, queued)["status"] == "cancelled"
+
+
+def test_recover_and_interrupted_runs(server):
+    crashed = jobs.submit(server.db, {})
+    interrupted = jobs.submit(server.db, {})
+    server.claim()
+    server.claim()
+
+    # A run the server ends itself is queued again, without using an attempt
+    server.running = {interrupted: None}
+    server.stop()
+    server.finish(interrupted, crashed=True)
+    assert job(server, interrupted)["status"] == "queued"
+    assert job(server, interrupted)["attempts"] == 0
+
+    # A run left 'running' by a dead server counts as a crash
+    jobs.JobServer(server.db_path, server.jobs_dir).recover()
+    assert job(server, crashed)["status"] == "queued"
+    assert job(server, crashed)["error"] == "server stopped during the run"
+
+
+def test_failed_run_keeps_the_end_of_its_log(server, monkeypatch):
+    job_id = jobs.submit(server.db, {}, max_attempts=1)
+    claimed = server.claim()
+
+    real_exec = asyncio.create_subprocess_exec
+
+    def failing_run(*args, **kwargs):
+        return real_exec(sys.executable, "-c", "import sys; print('broken run'); sys.exit(3)", **kwargs)
+
+    monkeypatch.setattr(jobs.asyncio, "create_subprocess_exec", failing_run)
+    asyncio.run(server.run(*claimed))
+
+    row = job(server, job_id)
+    assert row["status"] == "failed"
+    assert row["error"] == "exit code 3: broken run"
+
+
+def test_queued_runs_stop_once_settled(server, monkeypatch):
+    import Constants
+    import EvolutionGame
+
+    runs = []
+    monkeypatch.setattr(EvolutionGame, "main", lambda **kwargs: runs.append(kwargs))
+
+    default = jobs.submit(server.db, {})
+    explicit = jobs.submit(server.db, {"end_action": "off"})
+    for job_id in (default, explicit):
+        server.claim()
+        jobs.run_job(server.db_path, job_id)
+
+    # Nobody closes a queued run, unlike one in the window
+    assert Constants.END_ACTION == "off"
+    assert [run["end_action"] for run in runs] == [Constants.HEADLESS_END_ACTION, "off"]
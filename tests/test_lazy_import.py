@@ -0,0 +1,26 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import os
+import sys
+import json
+import subprocess
+
+from tools.lazy_import import lazy_module
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_module_is_imported_on_first_use():
+    module = lazy_module("json.decoder")
+    assert "JSONDecodeError" not in vars(module)
+
+    assert module.JSONDecodeError is json.decoder.JSONDecodeError
+    assert "JSONDecodeError" in vars(module)
+
+
+def test_headless_import_skips_gui_and_video():
+    code = "import sys, EvolutionGame; print(sorted(m for m in ('pygame', 'tkinter', 'cv2') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
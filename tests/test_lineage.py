@@ -0,0 +1,108 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import os
+
+import pytest
+import numpy as np
+
+import Life
+import Constants
+from tools.lineage import LineageWriter, LineageReader
+
+
+def logged_run(make_sector, path, steps=10, batch=64):
+    sector = make_sector(seed=1)
+    log = LineageWriter(str(path), batch=batch)
+    sector.record_lineage(log)
+    for _ in sector.states(steps):
+        pass
+    log.close()
+    return sector, LineageReader(str(path))
+
+
+def test_births_are_logged(make_sector, tmp_path):
+    sector, log = logged_run(make_sector, tmp_path / "run.lineage")
+
+    assert log.rows > len(log.header["founders"])
+    assert sorted(log.header["founders"]) == ["0", "1"]
+
+    # A parent is always born before its children
+    parent = np.asarray(log.parent)
+    born = np.flatnonzero(parent >= 0)
+    assert (parent[born] < born).all()
+
+    # Every life on the grid has its row
+    for cell in sector.world.cells.values():
+        if cell.occupied:
+            uid = cell.occupied.uid
+            assert 0 <= uid < log.rows
+            assert log.type[uid] == cell.occupied.code
+            assert log.family[uid] == cell.occupied.family_idx
+
+
+def test_ancestry_queries(make_sector, tmp_path):
+    _, log = logged_run(make_sector, tmp_path / "run.lineage")
+    parent = np.asarray(log.parent)
+
+    for uid in range(0, log.rows, 7):
+        # Descendants against a plain walk over the rows
+        expected = {uid}
+        for row in range(uid + 1, log.rows):
+            if parent[row] in expected:
+                expected.add(row)
+        assert set(log.descendants(uid).tolist()) == expected - {uid}
+
+        line = log.ancestors(uid)
+        assert all(parent[child] == ancestor for child, ancestor in zip([uid] + line, line))
+        assert not line or parent[line[-1]] == -1
+
+
+def test_index_is_reused(make_sector, tmp_path):
+    _, log = logged_run(make_sector, tmp_path / "run.lineage")
+    log.index()
+    children = [log.children(uid).tolist() for uid in range(log.rows)]
+
+    reopened = LineageReader(str(tmp_path / "run.lineage"))
+    assert [reopened.children(uid).tolist() for uid in range(reopened.rows)] == children
+
+
+def test_next_sector_does_not_log_into_a_closed_log(make_sector, tmp_path):
+    logged_run(make_sector, tmp_path / "run.lineage")
+
+    sector = make_sector(seed=2)
+    assert Life.Life.lineage is None
+    for _ in sector.states(5):
+        pass
+
+
+def test_family_dna_is_rebuilt_from_the_log(make_sector, tmp_path):
+    sector, log = logged_run(make_sector, tmp_path / "run.lineage", steps=30)
+
+    # Births that found no room still shifted the DNA of their family
+    assert (np.asarray(log.type) == Constants.EMPTY).any()
+
+    for cell in sector.world.cells.values():
+        life = cell.occupied
+        if life and life.dna:
+            rebuilt = log.family_dna(life.family_idx)
+            assert rebuilt == pytest.approx(life.dna.data, abs=1e-6)
+
+
+def test_unfinished_log_can_be_read(make_sector, tmp_path):
+    path = str(tmp_path / "run.lineage")
+    sector = make_sector(seed=1)
+    log = LineageWriter(path, batch=64)
+    sector.record_lineage(log)
+    for _ in sector.states(10):
+        pass
+
+    # Still running: every batch so far, no cached index
+    reader = LineageReader(path)
+    assert not reader.closed
+    assert 0 < reader.rows == log.flushed <= log.rows
+    assert len(reader.descendants(0)) < reader.rows
+    assert not os.path.exists(os.path.join(path, "children.offsets.i64"))
+
+    log.close()
+    assert LineageReader(path).rows == log.rows
@@ -0,0 +1,74 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import numpy as np
+import pytest
+
+import Life
+import World
+import Constants
+
+
+def assert_maps_in_sync(sector):
+    ''' Type, Family & Direction Maps and Bitmaps Match the Life on Every Cell '''
+
+    world = sector.world
+    types = np.full(world.shape, Constants.EMPTY)
+    families = np.full(world.shape, -1)
+    directions = np.zeros(world.shape)
+
+    for key, cell in world.cells.items():
+        i, j = divmod(key, world.shape[1])
+        if cell.occupied:
+            types[i, j] = cell.occupied.code
+            families[i, j] = cell.occupied.family_idx
+            directions[i, j] = cell.occupied.direction
+
+    assert (world.dense("type") == types).all()
+    assert (world.dense("family") == families).all()
+    assert (world.dense("direction") == directions).all()
+    assert (World.unpack_bits(world.bitmap(), world.shape[1]) == (types != Constants.EMPTY)).all()
+    for chunk in world.chunks.values():
+        i0, j0 = chunk.origin
+        assert (chunk.occupied() == (types[i0:i0 + chunk.shape[0], j0:j0 + chunk.shape[1]] != Constants.EMPTY)).all()
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_maps_follow_every_placement(make_sector, sparse):
+    sector = make_sector(sparse_world=sparse, families_count=4)
+
+    for state in sector.states(30, every=10):
+        assert_maps_in_sync(sector)
+
+
+def test_kill_and_replace(make_sector):
+    sector = make_sector()
+    cell = sector.world.cell(3, 17)
+
+    cell.kill_life(Life.Root(1))
+    assert cell.chunk.type[cell.idx] == Constants.ROOT
+
+    cell.kill_life(Life.Leaf(0))
+    assert cell.chunk.type[cell.idx] == Constants.LEAF
+    assert cell.chunk.family[cell.idx] == 0
+
+    cell.kill_life()
+    assert_maps_in_sync(sector)
+
+
+def test_blocks(make_sector):
+    sector = make_sector()
+    cell = sector.world.cell(5, 5)
+    chunk, idx = cell.chunk, cell.idx
+
+    assert not chunk.blocks(idx, 0)
+
+    cell.occupied = Life.Leaf(0)
+    assert chunk.blocks(idx, 0)
+    assert not chunk.blocks(idx, 1)
+
+    # Roots & pipes block every family
+    cell.occupied = Life.Root(0)
+    assert chunk.blocks(idx, 1)
+    cell.occupied = Life.Pipe(0)
+    assert chunk.blocks(idx, 1)
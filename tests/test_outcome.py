@@ -0,0 +1,62 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+from types import SimpleNamespace
+
+import numpy as np
+
+import Outcome
+
+
+class FakeWorld:
+    def __init__(self):
+        self.fields = {"organic": 0.1, "energy": 0.2}
+
+    def mean(self, name):
+        return self.fields[name]
+
+
+def fake_sector(population, newborns, day=0):
+    return SimpleNamespace(population=np.array(population), newborn_population=np.array(newborns),
+                           day_counter=day, world=FakeWorld())
+
+
+def test_extinction():
+    detector = Outcome.EndDetector()
+    assert detector.update(fake_sector([5, 3], [1, 1])) is None
+    assert detector.update(fake_sector([5, 3], [0, 0], day=9)) == Outcome.EXTINCTION
+    assert "day 9" in detector.detail
+
+
+def test_dominance_needs_several_families_first():
+    detector = Outcome.EndDetector((Outcome.DOMINANCE,))
+    assert detector.update(fake_sector([4, 0], [2, 0])) is None
+
+    detector = Outcome.EndDetector((Outcome.DOMINANCE,))
+    assert detector.update(fake_sector([4, 4], [2, 1])) is None
+    assert detector.update(fake_sector([9, 1], [3, 0])) == Outcome.DOMINANCE
+    assert "family 0" in detector.detail
+
+
+def test_steady_state_over_the_window():
+    detector = Outcome.EndDetector((Outcome.STEADY,), window=4, tolerance=0.05)
+
+    reasons = [detector.update(fake_sector([100 + step % 2, 50], [1, 1])) for step in range(4)]
+    assert reasons == [None, None, None, Outcome.STEADY]
+
+
+def test_changing_populations_are_not_steady():
+    detector = Outcome.EndDetector((Outcome.STEADY,), window=4, tolerance=0.05)
+
+    reasons = [detector.update(fake_sector([100 + 10 * step, 50], [1, 1])) for step in range(8)]
+    assert not any(reasons)
+
+
+def test_states_end_on_extinction(make_sector):
+    sector = make_sector()
+    detector = Outcome.EndDetector((Outcome.EXTINCTION,))
+
+    states = list(sector.states(2000, every=50, detector=detector))
+    assert states[-1].end_reason == Outcome.EXTINCTION
+    assert states[-1].step < 2000
+    assert not states[-1].newborn_population.any()
@@ -0,0 +1,71 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+from tools.pacing import StepPacer, SaveSchedule
+
+
+def test_fixed_steps():
+    pacer = StepPacer(4, 50)
+    pacer.record_step(0.001)
+    pacer.record_frame(0.010)
+
+    assert pacer.steps == 4
+    assert pacer.interval() == 1 / 200
+
+
+def test_unbounded_without_steps():
+    assert StepPacer(0, 60).interval() == 0.0
+    assert StepPacer(3, 0).interval() == 0.0
+
+
+def test_adaptive_steps_fill_the_frame_budget():
+    ''' K Doubles per Frame until the Steps Fill what Drawing Leaves '''
+
+    pacer = StepPacer(0, 60, target_fps=50, smoothing=1)
+    pacer.record_step(0.001)
+
+    history = []
+    for _ in range(6):
+        pacer.record_frame(0.010)
+        history.append(pacer.steps)
+
+    # 20 ms per frame, 10 ms drawing: room for 10 steps of 1 ms
+    assert history == [2, 4, 8, 10, 10, 10]
+    assert pacer.interval() == 1 / (50 * 10)
+
+
+def test_adaptive_steps_shrink_when_drawing_slows():
+    pacer = StepPacer(0, 60, target_fps=50, smoothing=1)
+    pacer.record_step(0.001)
+    for _ in range(5):
+        pacer.record_frame(0.010)
+
+    pacer.record_frame(0.030)
+    assert pacer.steps == 1
+
+
+def test_manual_speed_ends_adapting():
+    pacer = StepPacer(0, 60, target_fps=50)
+    pacer.faster()
+
+    assert not pacer.adaptive
+    assert pacer.steps == 2
+
+
+def test_save_every_n_steps_from_the_start_day():
+    saver = SaveSchedule(every=3, start_day=2)
+
+    assert not saver.due(3, 1)
+    assert [step for step in range(1, 10) if saver.due(step, 2)] == [3, 6, 9]
+
+
+def test_save_fps():
+    now = [0.0]
+    saver = SaveSchedule(fps=2, clock=lambda: now[0])
+
+    due = []
+    for _ in range(5):
+        due.append(saver.due(1, 0))
+        now[0] += 0.3
+
+    assert due == [True, False, True, False, True]
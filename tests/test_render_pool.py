@@ -0,0 +1,22 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import pytest
+
+import RenderPool
+
+
+def test_dead_worker_raises():
+    ''' Slots Held by a Dead Worker Never Come Back, acquire Raises '''
+
+    pool = RenderPool.RenderPool(2, (16, 16), slots=2)
+    try:
+        assert pool.acquire(timeout=1) is not None
+        pool.workers[0].kill()
+        pool.workers[0].join()
+
+        # Noticed at once, though a slot is still free and the other worker runs
+        with pytest.raises(RuntimeError, match="render-0 exited"):
+            pool.acquire(timeout=1)
+    finally:
+        pool.close()
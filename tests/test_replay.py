@@ -0,0 +1,75 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import numpy as np
+import pytest
+
+from tools import replay
+
+
+def stored_state(sector) -> np.ndarray:
+    ''' What a Replay Frame Should Decode to, (LAYERS, height, width) '''
+
+    return np.stack([replay.encode_layer(name, sector.world.dense(name).T) for name in replay.LAYERS])
+
+
+@pytest.mark.parametrize("sparse, chunk_size", [(False, 64), (True, 64), (True, 24)])
+def test_round_trip(make_sector, tmp_path, sparse, chunk_size):
+    sector = make_sector(sector_size_x=240, sector_size_y=200, sparse_world=sparse, chunk_size=chunk_size)
+    path = str(tmp_path / "run.cevr")
+
+    writer = replay.ReplayWriter(path, *sector.world.shape, 2, keyframe_interval=7)
+    writer.write_sector(sector)
+    expected = [(sector.day_counter, stored_state(sector))]
+    for _ in range(20):
+        sector.step()
+        writer.write_sector(sector)
+        expected.append((sector.day_counter, stored_state(sector)))
+    writer.close()
+
+    reader = replay.ReplayReader(path)
+    assert len(reader.index) == 3
+
+    decoded = [(tick, layers.copy()) for tick, layers in reader.frames()]
+    assert [tick for tick, _ in decoded] == [tick for tick, _ in expected]
+    for (_, layers), (_, state) in zip(decoded, expected):
+        assert (layers == state).all()
+
+    # Seeking starts from the keyframe before the tick
+    tick, layers = next(reader.frames(from_tick=expected[10][0]))
+    assert tick == expected[10][0] and (layers == expected[10][1]).all()
+
+
+def test_varints_round_trip():
+    values = np.array([0, 1, 127, 128, 300, 2 ** 21, 2 ** 35 - 1])
+    buffer = b"\xff" + replay.encode_varints(values) + b"\x00" * 100
+
+    decoded, end = replay.decode_varints(buffer, 1, len(values))
+    assert decoded.tolist() == values.tolist()
+    assert end == len(buffer) - 100
+
+
+def test_change_before_settling_is_recorded(make_sector, tmp_path):
+    ''' A Chunk Changed in the Step it Settled in is Still Compared '''
+
+    sector = make_sector(sector_size_x=240, sector_size_y=200, chunk_size=24)
+    path = str(tmp_path / "run.cevr")
+
+    writer = replay.ReplayWriter(path, *sector.world.shape, 2)
+    writer.write_sector(sector)
+
+    chunk = next(chunk for chunk in sector.world.chunks.values() if not chunk.alive)
+    chunk.organic[:] = 0.5
+    sector.world.settle(chunk)
+    assert chunk not in sector.world.active_chunks()
+
+    writer.write_sector(sector)
+    writer.close()
+
+    _, layers = list(replay.ReplayReader(path).frames())[-1]
+    assert (layers == stored_state(sector)).all()
+
+
+def test_too_many_families(tmp_path):
+    with pytest.raises(ValueError, match="at most 254 families"):
+        replay.ReplayWriter(str(tmp_path / "run.cevr"), 10, 10, 255)
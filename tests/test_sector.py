@@ -0,0 +1,95 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import pytest
+import numpy as np
+
+import Life
+import Constants
+
+
+def empty_cell(sector):
+    ''' Cell Away from the Founders, None of its Neighbours Hold Life '''
+
+    width, height = sector.world.shape
+    for i in range(2, width - 2):
+        for j in range(2, height - 2):
+            cells = [sector.world.cell(i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)]
+            if not any(cell.occupied for cell in cells):
+                return sector.world.cell(i, j)
+
+
+def test_age_death_on_toxic_energy(make_sector):
+    ''' A Life Dying of Age on a Toxic Cell is Removed Once, Without Error '''
+
+    sector = make_sector()
+    cell = empty_cell(sector)
+
+    leaf = Life.Leaf(0)
+    leaf.age = leaf.lifelen + 1
+    cell.set_living_cell(leaf)
+    cell.energy_level = 0.95
+
+    sector.step()
+
+    assert cell.occupied is None
+    assert cell.chunk.type[cell.idx] == Constants.EMPTY
+
+
+def test_remove_tail_of_empty_cell(make_sector):
+    sector = make_sector()
+    cell = empty_cell(sector)
+
+    sector.remove_tail(cell)
+    assert cell.occupied is None
+
+
+def place_leaf(sector, i, j):
+    cell = sector.world.cell(i % sector.world.shape[0], j % sector.world.shape[1])
+    if not cell.occupied:
+        cell.set_living_cell(Life.Leaf(0))
+
+
+@pytest.mark.parametrize("sparse, chunk_size", [(False, 64), (False, 7), (True, 7), (True, 8)])
+def test_harvest_matches_cell_by_cell(make_sector, sparse, chunk_size):
+    ''' Whole-Grid Harvest Equals the Per-Cell Rules, across Chunk Edges and the Torus '''
+
+    sector = make_sector(sector_size_x=800, sector_size_y=640, sparse_world=sparse, chunk_size=chunk_size)
+    for _ in range(15):
+        sector.step()
+    sector.light_global = 0.8
+
+    width, height = sector.world.shape
+    # Leaf pairs across a chunk edge and across the wrap of the grid
+    for i, j in ((chunk_size - 1, 3), (chunk_size, 3), (0, 20), (-1, 20), (30, 0), (30, -1)):
+        place_leaf(sector, i, j)
+    # A lone leaf at the corner of a chunk
+    place_leaf(sector, 2 * chunk_size - 1, 2 * chunk_size - 1)
+
+    if sparse:
+        # Some lives border a chunk that was never allocated
+        ni, nj = sector.world.chunk_counts
+        assert any(chunk.alive and any(((ci + di) % ni, (cj + dj) % nj) not in sector.world.chunks
+                                       for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)))
+                   for (ci, cj), chunk in sector.world.chunks.items())
+
+    types, families, organic, energy = (sector.world.window(name, 0, width, 0, height)
+                                        for name in ("type", "family", "organic", "energy"))
+
+    expected = np.zeros(len(sector.gathered_energy))
+    for i in range(width):
+        for j in range(height):
+            if types[i, j] == Constants.LEAF:
+                neighbours = [types[(i + di) % width, (j + dj) % height] for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1))]
+                if Constants.LEAF not in neighbours:
+                    expected[families[i, j]] += 0.8
+            elif types[i, j] == Constants.ROOT:
+                expected[families[i, j]] += organic[i, j] * 0.7 * 0.3
+            elif types[i, j] == Constants.RADIO:
+                expected[families[i, j]] += energy[i, j] * 0.7 * 0.3
+
+    before = sector.gathered_energy.copy()
+    sector.harvest_energy()
+
+    assert expected.sum() > 0
+    assert np.allclose(sector.gathered_energy - before, expected)
@@ -0,0 +1,60 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import pytest
+
+import Render
+import Simulation
+import EvolutionGame
+from tools import pacing
+from tools.replay import ReplayReader
+
+
+def test_camera_is_handed_over_as_a_copy(make_sector):
+    sector = make_sector()
+    camera = Render.Camera(sector.world.shape, (80, 80))
+    simulation = Simulation.Simulation(sector, camera, pacing.StepPacer(1, 0), pacing.SaveSchedule(1))
+
+    camera.pan(40, 40)
+    assert (simulation.camera.x, simulation.camera.y) == (0, 0)
+
+    simulation.set_camera(camera)
+    assert (simulation.camera.x, simulation.camera.y) == (camera.x, camera.y)
+    assert simulation.camera is not camera
+
+
+def test_main_closes_outputs_on_error(tmp_path, monkeypatch):
+    ''' A Failing Simulation Still Leaves Complete Output Files '''
+
+    def fail(self):
+        raise RuntimeError("step failed")
+
+    monkeypatch.setattr(Simulation.Simulation, "loop", fail)
+    replay_path = tmp_path / "run.cevr"
+
+    with pytest.raises(RuntimeError, match="step failed"):
+        EvolutionGame.main(sector_size_x=80, sector_size_y=80, families_count=2, tick=0,
+                           folder_path=str(tmp_path / "frames"), replay_path=str(replay_path))
+
+    # The index & footer are only written by close()
+    assert ReplayReader(str(replay_path)).read_index()
+
+
+def test_frame_file_is_written_off_the_stepping_thread(make_sector):
+    ''' Frames for the Frame File Wait in the Save Queue, Encoding Never Stalls a Step '''
+
+    class Writer:
+        frames = []
+
+        def write_frame(self, *args):
+            raise AssertionError("written on the stepping thread")
+
+    sector = make_sector()
+    camera = Render.Camera(sector.world.shape, (80, 80))
+    simulation = Simulation.Simulation(sector, camera, pacing.StepPacer(1, 0), pacing.SaveSchedule(1),
+                                       finish=sector.day_counter + 3, frame_writer=Writer())
+    simulation.loop()
+
+    saved = simulation.saved_frames()
+    assert len(saved) == simulation.step_count
+    assert all(saved_camera is not camera for _, saved_camera in saved)
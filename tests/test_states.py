@@ -0,0 +1,35 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import numpy as np
+import pytest
+
+import World
+import Constants
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_occupied_matches_the_types(make_sector, sparse):
+    sector = make_sector(sparse_world=sparse)
+
+    for state in sector.states(5):
+        occupied = World.unpack_bits(state.occupied, sector.world.shape[1])
+        assert (occupied == (np.asarray(state.types) != Constants.EMPTY)).all()
+
+
+def test_occupied_is_a_read_only_view_in_a_dense_world(make_sector):
+    sector = make_sector(sparse_world=False)
+    state = next(sector.states(1))
+
+    assert np.shares_memory(state.occupied, sector.world.occupancy)
+    assert not state.occupied.flags.writeable
+
+
+def test_stale_state_raises(make_sector):
+    sector = make_sector()
+    states = sector.states(2)
+    state = next(states)
+    next(states)
+
+    with pytest.raises(RuntimeError, match="stale"):
+        state.occupied
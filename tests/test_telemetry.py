@@ -0,0 +1,71 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import zlib
+import struct
+import threading
+import urllib.request
+
+import numpy as np
+
+from tools import telemetry
+
+
+def test_png_encoding():
+    pixels = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    png = telemetry.encode_png(pixels)
+
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    assert struct.unpack(">II", png[16:24]) == (3, 2)
+
+    length, = struct.unpack(">I", png[33:37])
+    raw = np.frombuffer(zlib.decompress(png[41:41 + length]), dtype=np.uint8).reshape(2, 10)
+    assert (raw[:, 0] == 0).all()
+    assert np.array_equal(raw[:, 1:].reshape(2, 3, 3), pixels)
+
+
+def test_metrics():
+    server = telemetry.Telemetry(0)
+    assert "evolution_tick" not in server.render_metrics()
+
+    server.publish(5, [3, 0], 2)
+    server.publish(6, [4, 1], 1)
+    text = server.render_metrics()
+
+    assert "evolution_tick 6" in text
+    assert "evolution_steps_total 2" in text
+    assert 'evolution_family_population{family="1"} 1' in text
+    assert "evolution_newborn_count 1" in text
+
+
+def test_no_preview_before_a_frame():
+    assert telemetry.Telemetry(0).render_preview(timeout=0.01) is None
+
+
+def test_preview_is_handed_over_by_the_render_loop():
+    server = telemetry.Telemetry(0, preview_width=4)
+
+    def render_loop():
+        server.frame_wanted.wait(1)
+        server.publish_frame(8, 2, bytes(8 * 2 * 3))
+
+    thread = threading.Thread(target=render_loop)
+    thread.start()
+    png = server.render_preview(timeout=1)
+    thread.join()
+
+    # Downscaled to at most the preview width
+    assert struct.unpack(">II", png[16:24]) == (4, 1)
+    assert not server.wants_frame()
+
+
+def test_server():
+    server = telemetry.Telemetry(0)
+    server.start()
+    try:
+        server.publish(1, [1], 0)
+        port = server.server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert b"evolution_tick 1" in response.read()
+    finally:
+        server.stop()
@@ -0,0 +1,92 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import numpy as np
+import pytest
+
+import World
+import Constants
+
+DEFAULTS = {"energy": 0.2, "organic": 0.05, "type": Constants.EMPTY, "family": -1, "direction": 0}
+
+
+def make_world(sparse, shape=(150, 90), chunk_size=32):
+    def init_chunk(chunk):
+        # Deterministic per chunk, like Sector.init_chunk
+        rng = np.random.default_rng(chunk.key)
+        chunk.energy[:] = rng.uniform(0, 0.2, chunk.shape)
+
+    return World.World(shape, lambda i, j, chunk, idx: (i, j, chunk, idx), init_chunk, DEFAULTS,
+                       sparse=sparse, chunk_size=chunk_size)
+
+
+def test_sparse_allocates_only_touched_chunks():
+    world = make_world(sparse=True)
+    assert not world.chunks
+
+    world.cell(40, 70)
+    assert list(world.chunks) == [(1, 2)]
+    assert world.dense("energy").shape == world.shape
+
+
+def test_sparse_and_dense_read_alike():
+    ''' Same Writes, Same Reads: Untouched Sparse Chunks Read as their Defaults '''
+
+    dense, sparse = make_world(sparse=False), make_world(sparse=True)
+    for world in (dense, sparse):
+        world.fill("organic", 10, 50, 20, 30, 1)
+        world.fill("organic", 140, 160, -5, 5, 0.7)
+
+    # Sparse chunks are initialized on first use only, touch the same ones
+    for key in dense.chunks:
+        sparse.chunk(*key)
+
+    for name in ("energy", "organic", "type", "family"):
+        assert (dense.dense(name) == sparse.dense(name)).all()
+        assert (dense.window(name, 5, 77, 3, 61) == sparse.window(name, 5, 77, 3, 61)).all()
+        assert (dense.sample(name, 1, 150, 2, 90, 7) == sparse.sample(name, 1, 150, 2, 90, 7)).all()
+        assert dense.mean(name) == pytest.approx(sparse.mean(name))
+
+
+def test_sparse_reads_without_allocating():
+    world = make_world(sparse=True)
+    world.fill("organic", 0, 10, 0, 10, 1)
+
+    window = world.window("organic", 0, 150, 0, 90)
+    assert len(world.chunks) == 1
+    assert (window[:10, :10] == 1).all() and (window[10:, :] == DEFAULTS["organic"]).all()
+    assert world.mean("organic") == pytest.approx((100 + DEFAULTS["organic"] * (150 * 90 - 100)) / (150 * 90))
+
+
+def test_dense_chunks_are_views_of_the_backing():
+    world = make_world(sparse=False)
+    chunk = world.chunk(1, 1)
+    chunk.organic[0, 0] = 0.9
+
+    assert world.backing["organic"][32, 32] == 0.9
+
+
+def test_padded_wraps_around_the_torus():
+    world = make_world(sparse=False, shape=(64, 64), chunk_size=32)
+    organic = world.backing["organic"]
+    organic[:] = np.arange(64 * 64).reshape(64, 64)
+
+    padded = world.padded(world.chunk(0, 0), "organic")
+    assert (padded[1:-1, 1:-1] == organic[:32, :32]).all()
+    assert (padded[0, 1:-1] == organic[-1, :32]).all()
+    assert (padded[1:-1, 0] == organic[:32, -1]).all()
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_sector_starts_alike(make_sector, sparse):
+    ''' Chunk Fields Follow the Seed, not the Order Chunks are Allocated in '''
+
+    dense_sector = make_sector(seed=3, sparse_world=False)
+    other = make_sector(seed=3, sparse_world=sparse)
+
+    for name in ("energy", "organic", "type", "family"):
+        touched = np.zeros(dense_sector.world.shape, dtype=bool)
+        for chunk in other.world.chunks.values():
+            i0, j0 = chunk.origin
+            touched[i0:i0 + chunk.shape[0], j0:j0 + chunk.shape[1]] = True
+        assert (dense_sector.world.dense(name)[touched] == other.world.dense(name)[touched]).all()
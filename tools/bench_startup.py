@@ -0,0 +1,87 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Startup Benchmark: Import Time & Time to the First Sector Step
+#
+#   python -m tools.bench_startup --repeat 5 --history bench_startup.jsonl
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy modules that a headless import should not pull in
+HEAVY_MODULES = ["tkinter", "pygame", "cv2"]
+
+# Runs in a fresh interpreter so nothing is cached between samples
+PROBE = """
+import sys, json, time, random
+start = time.perf_counter()
+import EvolutionGame
+imported = time.perf_counter()
+
+random.seed(0)
+EvolutionGame.configure(sector_size_x={size}, sector_size_y={size}, families_count={families})
+sector = EvolutionGame.Sector()
+sector.grant_life_access()
+sector.step()
+stepped = time.perf_counter()
+
+print(json.dumps({{
+    "import_s": imported - start,
+    "first_step_s": stepped - start,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def sample(size, families) -> dict:
+    ''' One Cold Start in a Subprocess '''
+
+    probe = PROBE.format(size=size, families=families, heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_s"] = time.perf_counter() - started
+
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure import time and time to first step.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--size", type=int, default=240, help="Sector size in pixels (both sides)")
+    parser.add_argument("--families", type=int, default=4)
+    parser.add_argument("--history", help="Append the result as a JSON line to this file")
+    args = parser.parse_args()
+
+    samples = [sample(args.size, args.families) for _ in range(args.repeat)]
+    result = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "size": args.size,
+    }
+    for key in ("import_s", "first_step_s", "process_s"):
+        result[key] = statistics.median(sample[key] for sample in samples)
+    result["loaded"] = samples[-1]["loaded"]
+
+    print(f"import EvolutionGame   {result['import_s'] * 1000:8.1f} ms")
+    print(f"first Sector.step      {result['first_step_s'] * 1000:8.1f} ms")
+    print(f"interpreter total      {result['process_s'] * 1000:8.1f} ms")
+    print(f"heavy modules loaded   {', '.join(result['loaded']) or 'none'}")
+
+    if args.history:
+        with open(args.history, "a") as history:
+            history.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Adaptive DNA Search: Successive Halving over Headless Sector Runs
+#
+#   python -m tools.dna_search --candidates 27 --eta 3 --min-steps 50 --max-steps 450
+#   python -m tools.dna_search --rounds 3 --seeds 2 --output dna_search.json
+#
+# Each round samples DNA vectors (the DNADialog sliders), runs them all on a
+# small step budget, keeps the best 1/eta and runs those eta times longer,
+# until the budget reaches --max-steps. Later rounds sample half of their
+# candidates around the best DNA found so far. The runs of one rung share
+# their seeds, so candidates are compared on the same starting sectors.
+
+import os
+import json
+import math
+import time
+import random
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import Constants
+
+# Weight of the harvested energy against the survival (0-1) in the score
+ENERGY_WEIGHT = 0.1
+
+
+def evaluate(dna, seed, steps, config) -> dict:
+    ''' One Headless Run of a DNA, Scored by Family Survival & Harvested Energy
+
+        Survival is the mean share of the budget each family kept Newborns
+        (the only cells that reproduce), the energy term is the log of the
+        energy harvested per family and step. The run ends early once every
+        family died out. '''
+
+    import EvolutionGame
+    import Outcome
+
+    random.seed(seed)
+    EvolutionGame.configure(**config)
+    sector = EvolutionGame.Sector(**dna)
+    sector.grant_life_access()
+
+    families = config["families_count"]
+    last_alive = np.zeros(families)
+    detector = Outcome.EndDetector((Outcome.EXTINCTION,))
+
+    state = None
+    for state in sector.states(steps, detector=detector):
+        last_alive[state.newborn_population > 0] = state.step
+
+    survival = float(last_alive.mean() / steps)
+    energy = float(state.harvested_energy.sum() / families / steps)
+
+    return {
+        "seed": seed,
+        "steps": steps,
+        "steps_run": state.step,
+        "survival": survival,
+        "energy": energy,
+        "families_left": int((state.newborn_population > 0).sum()),
+        "score": survival + ENERGY_WEIGHT * math.log10(1 + energy),
+    }
+
+
+def random_dna(rng) -> dict:
+    return {field: round(rng.uniform(0, 1), 3) for field in Constants.fields}
+
+
+def nearby_dna(dna, rng, spread=0.1) -> dict:
+    ''' Gaussian Step around a DNA, Kept within the Slider Range '''
+
+    return {field: round(min(max(value + rng.gauss(0, spread), 0), 1), 3) for field, value in dna.items()}
+
+
+class SuccessiveHalving:
+    ''' Runs Rounds of Successive Halving on a Process Pool '''
+
+    def __init__(self, pool, config, eta=3, min_steps=50, max_steps=450, seeds=1, rng=None):
+        self.pool = pool
+        self.config = config
+        self.eta = eta
+        self.min_steps = min_steps
+        self.max_steps = max_steps
+        self.seeds = seeds
+        self.rng = rng or random.Random()
+
+        self.evaluations = []
+        self.budget = 0
+        self.steps_run = 0
+
+    def rung(self, candidates, steps) -> list:
+        ''' Mean Score of Each Candidate over Shared Seeds, Best First '''
+
+        seeds = [self.rng.getrandbits(32) for _ in range(self.seeds)]
+        runs = [[self.pool.submit(evaluate, dna, seed, steps, self.config) for seed in seeds] for dna in candidates]
+
+        results = []
+        for dna, futures in zip(candidates, runs):
+            scores = [future.result() for future in futures]
+            self.evaluations += [{"dna": dna, **score} for score in scores]
+            self.budget += sum(score["steps"] for score in scores)
+            self.steps_run += sum(score["steps_run"] for score in scores)
+            results.append((float(np.mean([score["score"] for score in scores])), dna))
+
+        results.sort(key=lambda result: -result[0])
+        return results
+
+    def round(self, candidates) -> list:
+        ''' Halve the Candidates while Raising the Budget, Returns the Final Rung '''
+
+        steps = self.min_steps
+        while True:
+            results = self.rung(candidates, steps)
+            print(f"  {len(candidates):3d} candidates x {steps:4d} steps: best {results[0][0]:.3f}")
+
+            if steps >= self.max_steps or len(candidates) <= 1:
+                return results
+
+            keep = max(1, len(candidates) // self.eta)
+            candidates = [dna for _, dna in results[:keep]]
+            steps = min(steps * self.eta, self.max_steps)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search DNA for strong colonies with successive halving.")
+    parser.add_argument("--candidates", type=int, default=27, help="DNA vectors sampled per round")
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta of the candidates per rung")
+    parser.add_argument("--min-steps", type=int, default=50)
+    parser.add_argument("--max-steps", type=int, default=450)
+    parser.add_argument("--seeds", type=int, default=2, help="Runs per candidate and rung")
+    parser.add_argument("--size", type=int, default=240, help="Sector size in pixels (both sides)")
+    parser.add_argument("--families", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the search itself")
+    parser.add_argument("--output", help="Write every evaluation and the best DNA as JSON to this file")
+    args = parser.parse_args()
+
+    config = {"sector_size_x": args.size, "sector_size_y": args.size, "families_count": args.families}
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(args.workers, mp_context=context) as pool:
+        search = SuccessiveHalving(pool, config, args.eta, args.min_steps, args.max_steps, args.seeds, rng)
+
+        best = []
+        for round_idx in range(args.rounds):
+            # The default sliders first, later rounds half around the best so far
+            if round_idx == 0:
+                candidates = [{field: 0.5 for field in Constants.fields}]
+            else:
+                candidates = [nearby_dna(best[idx % len(best)][1], rng) for idx in range(args.candidates // 2)]
+            candidates += [random_dna(rng) for _ in range(args.candidates - len(candidates))]
+
+            print(f"Round {round_idx + 1}/{args.rounds}")
+            best = sorted(best + search.round(candidates), key=lambda result: -result[0])[:max(1, args.eta)]
+
+    score, dna = best[0]
+    exhaustive = args.rounds * args.candidates * args.max_steps * args.seeds
+    print(f"\nBest score {score:.3f} in {time.perf_counter() - started:.0f} s, "
+          f"{search.budget} steps of budget ({search.budget / exhaustive:.0%} of running every candidate in full), "
+          f"{search.steps_run} run before extinctions")
+    for field, value in dna.items():
+        print(f"  {field:14s} {value}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "arguments": vars(args),
+                "best": {"score": score, "dna": dna},
+                "budget": search.budget,
+                "steps_run": search.steps_run,
+                "evaluations": search.evaluations,
+            }, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Statistical Equivalence of Two Sector Engines
+#
+#   python -m tools.equivalence --seeds 20 --steps 300
+#   python -m tools.equivalence --candidate ../CellEvolution-fast --report equivalence.json
+#   python -m tools.equivalence --candidate-kwargs '{"sparse_world": true}'
+#
+# A faster engine cannot reproduce the reference step for step (the order of
+# execution is random), so both run over many seeds and the distributions of
+# what they produce are compared: population curves, survival times, cell
+# type ratios and field statistics. An engine is a source tree whose module
+# (EvolutionGame by default) has configure(**kwargs) and a Sector with
+# grant_life_access() and states(steps, every).
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seeds of the candidate runs start here, so an engine compared with itself
+# shows the false alarm rate of the harness instead of identical samples
+CANDIDATE_SEEDS = 1_000_000
+
+TYPE_NAMES = {1: "leaf", 2: "root", 3: "radio", 4: "newborn", 5: "pipe"}
+CHECKPOINTS = (0.25, 0.5, 0.75, 1.0)
+
+
+# Running an Engine (in a worker process bound to its source tree)
+
+def use_tree(root) -> None:
+    ''' Import the Engine (and its tools package) from the Given Tree '''
+
+    sys.path.insert(0, root)
+    if os.path.abspath(root) != ROOT_DIR:
+        for name in [name for name in sys.modules if name == "tools" or name.startswith("tools.")]:
+            if name != __name__:
+                del sys.modules[name]
+
+
+def simulate(engine, seed, steps, every, kwargs) -> dict:
+    ''' One Headless Run, Reduced to the Compared Metrics '''
+
+    import random
+    random.seed(seed)
+
+    game = importlib.import_module(engine)
+    game.configure(**kwargs)
+    sector = game.Sector(**kwargs)
+    sector.grant_life_access()
+
+    curve = []
+    survival = steps
+    ratios = {name: [] for name in TYPE_NAMES.values()}
+    fields = {"energy_mean": [], "energy_std": [], "organic_mean": [], "organic_std": []}
+
+    for state in sector.states(steps, every):
+        curve.append(int(state.population.sum()))
+        if survival == steps and not state.newborn_population.any():
+            survival = state.step
+
+        types = np.bincount(np.asarray(state.types).ravel(), minlength=max(TYPE_NAMES) + 1)
+        living = types[1:].sum()
+        if living:
+            for code, name in TYPE_NAMES.items():
+                ratios[name].append(types[code] / living)
+
+        for name in ("energy", "organic"):
+            layer = np.asarray(getattr(state, name))
+            fields[f"{name}_mean"].append(float(layer.mean()))
+            fields[f"{name}_std"].append(float(layer.std()))
+
+    metrics = {
+        "survival": survival,
+        "families_left": int((state.newborn_population > 0).sum()),
+        "peak_population": max(curve),
+        "mean_population": float(np.mean(curve)),
+    }
+    for fraction in CHECKPOINTS:
+        metrics[f"population@{fraction:.0%}"] = curve[max(int(len(curve) * fraction) - 1, 0)]
+    for name, values in ratios.items():
+        metrics[f"{name}_ratio"] = float(np.mean(values)) if values else float("nan")
+    for name, values in fields.items():
+        metrics[name] = float(np.mean(values))
+
+    return {"seed": seed, "metrics": metrics, "curve": curve}
+
+
+def run_engine(root, engine, seeds, steps, every, kwargs, workers) -> list:
+    ''' Runs of One Engine over the Seeds, in Parallel '''
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=use_tree, initargs=(root,)) as pool:
+        runs = [pool.submit(simulate, engine, seed, steps, every, kwargs) for seed in seeds]
+        return [run.result() for run in runs]
+
+
+# Statistics (numpy only)
+
+def ks_2samp(a, b) -> tuple:
+    ''' Two-Sample Kolmogorov-Smirnov Statistic & Asymptotic p-value '''
+
+    a = np.sort(a)
+    b = np.sort(b)
+    values = np.concatenate((a, b))
+    distance = np.abs(np.searchsorted(a, values, side="right") / len(a) -
+                      np.searchsorted(b, values, side="right") / len(b)).max()
+
+    if distance == 0:
+        return 0.0, 1.0
+
+    n = np.sqrt(len(a) * len(b) / (len(a) + len(b)))
+    lam = (n + 0.12 + 0.11 / n) * distance
+    k = np.arange(1, 101)
+    p_value = 2 * np.sum((-1) ** (k - 1) * np.exp(-2 * (k * lam) ** 2))
+
+    return float(distance), float(np.clip(p_value, 0, 1))
+
+
+def compare(reference, candidate, alpha=0.01, tolerance=0.1) -> list:
+    ''' Per-Metric Comparison of Two Lists of Runs
+
+        A metric differs when the KS test rejects equal distributions at
+        alpha (Bonferroni-corrected over the metrics) and the means are
+        more than the relative tolerance apart: a difference has to be
+        both detectable and large enough to matter. '''
+
+    names = list(reference[0]["metrics"])
+    level = alpha / len(names)
+
+    rows = []
+    for name in names:
+        a = np.array([run["metrics"][name] for run in reference], dtype=float)
+        b = np.array([run["metrics"][name] for run in candidate], dtype=float)
+        a = a[~np.isnan(a)]
+        b = b[~np.isnan(b)]
+
+        row = {"metric": name, "reference": None, "candidate": None, "ks": None, "p_value": None,
+               "relative_difference": None, "differs": False}
+        if len(a) and len(b):
+            scale = max(abs(a.mean()), abs(b.mean()), 1e-9)
+            row.update(reference=float(a.mean()), candidate=float(b.mean()),
+                       relative_difference=float(abs(a.mean() - b.mean()) / scale))
+            row["ks"], row["p_value"] = ks_2samp(a, b)
+            row["differs"] = row["p_value"] < level and row["relative_difference"] > tolerance
+
+        rows.append(row)
+
+    return rows
+
+
+def curve_band(runs) -> tuple:
+    ''' Mean Population Curve and its Standard Error over the Seeds '''
+
+    curves = np.array([run["curve"] for run in runs], dtype=float)
+    return curves.mean(axis=0), curves.std(axis=0) / np.sqrt(len(curves))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare a candidate Sector engine with the reference over many seeds.")
+    parser.add_argument("--reference", default=ROOT_DIR, help="Source tree of the reference engine")
+    parser.add_argument("--candidate", default=ROOT_DIR, help="Source tree of the candidate engine")
+    parser.add_argument("--engine", default="EvolutionGame", help="Module of the reference engine")
+    parser.add_argument("--candidate-engine", help="Module of the candidate engine (default: --engine)")
+    parser.add_argument("--reference-kwargs", default="{}", help="JSON kwargs of the reference runs")
+    parser.add_argument("--candidate-kwargs", default="{}", help="JSON kwargs of the candidate runs")
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--every", type=int, default=10, help="Steps between samples")
+    parser.add_argument("--size", type=int, default=240, help="Sector size in pixels (both sides)")
+    parser.add_argument("--families", type=int, default=4)
+    parser.add_argument("--alpha", type=float, default=0.01)
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative difference of the means allowed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--report", help="Write the comparison as JSON to this file")
+    args = parser.parse_args()
+
+    base = {"sector_size_x": args.size, "sector_size_y": args.size, "families_count": args.families}
+    engines = {
+        "reference": (args.reference, args.engine, range(args.seeds), {**base, **json.loads(args.reference_kwargs)}),
+        "candidate": (args.candidate, args.candidate_engine or args.engine,
+                      range(CANDIDATE_SEEDS, CANDIDATE_SEEDS + args.seeds), {**base, **json.loads(args.candidate_kwargs)}),
+    }
+
+    runs = {}
+    timing = {}
+    for label, (root, engine, seeds, kwargs) in engines.items():
+        started = time.perf_counter()
+        runs[label] = run_engine(os.path.abspath(root), engine, seeds, args.steps, args.every, kwargs, args.workers)
+        timing[label] = time.perf_counter() - started
+        print(f"{label:9s} {engine} from {root}: {args.seeds} runs in {timing[label]:.1f} s")
+
+    rows = compare(runs["reference"], runs["candidate"], args.alpha, args.tolerance)
+
+    print(f"\n{'metric':20s} {'reference':>12s} {'candidate':>12s} {'rel diff':>9s} {'KS':>6s} {'p':>8s}")
+    for row in rows:
+        if row["p_value"] is None:
+            print(f"{row['metric']:20s} {'no data':>12s}")
+            continue
+        print(f"{row['metric']:20s} {row['reference']:12.4g} {row['candidate']:12.4g} {row['relative_difference']:9.1%} "
+              f"{row['ks']:6.3f} {row['p_value']:8.3g}" + ("  DIFFERS" if row["differs"] else ""))
+
+    # Population curves: largest gap of the means in standard errors
+
+    reference_mean, reference_se = curve_band(runs["reference"])
+    candidate_mean, candidate_se = curve_band(runs["candidate"])
+    gap = np.abs(reference_mean - candidate_mean) / np.maximum(np.hypot(reference_se, candidate_se), 1e-9)
+    print(f"\npopulation curves: largest gap {gap.max():.1f} standard errors at step {(gap.argmax() + 1) * args.every}")
+
+    differing = [row["metric"] for row in rows if row["differs"]]
+    print("\nEquivalent" if not differing else f"\nNot equivalent: {', '.join(differing)}")
+    print(f"speed: candidate took {timing['candidate'] / timing['reference']:.2f}x the reference time")
+
+    if args.report:
+        with open(args.report, "w") as report:
+            json.dump({
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "arguments": vars(args),
+                "equivalent": not differing,
+                "metrics": rows,
+                "curves": {
+                    "reference": {"mean": reference_mean.tolist(), "se": reference_se.tolist()},
+                    "candidate": {"mean": candidate_mean.tolist(), "se": candidate_se.tolist()},
+                    "largest_gap_se": float(gap.max()),
+                },
+                "timing_s": timing,
+                "runs": runs,
+            }, report, indent=2)
+
+    sys.exit(1 if differing else 0)
+
+
+if __name__ == "__main__":
+    main()
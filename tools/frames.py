@@ -0,0 +1,160 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Frame File Layout (little-endian), a Compact Alternative to a Folder of PNGs
+#
+#   "CEVF" | u32 header length | JSON header (window size, RGB palette)
+#   chunks:  u32 compressed length | zlib(frames)
+#   index:   u32 chunk count | (u32 first tick, u64 offset) per chunk
+#   footer:  u64 index offset | "CEVI"
+#
+# A frame is one palette index per visible cell (or block when zoomed out):
+#   u32 tick | u32 family count | u32 newborn count |
+#   u16 width | u16 height | f32 pixels per cell | i32 x, y offset in pixels |
+#   width*height palette indices, row-major (index = y * width + x)
+
+import json
+import zlib
+import struct
+
+import numpy as np
+
+import Render
+
+MAGIC = b"CEVF"
+INDEX_MAGIC = b"CEVI"
+VERSION = 1
+FRAME_HEADER = struct.Struct("<IIIHHfii")
+
+
+class FrameWriter:
+    ''' Appends Palette-Indexed Frames to One Chunked, Compressed File '''
+
+    def __init__(self, path, window, family_colors, level=6, chunk_frames=32):
+        self.file = open(path, "wb")
+        self.window = window
+        self.level = level
+        self.chunk_frames = chunk_frames
+
+        self.frames = []
+        self.chunk_tick = 0
+        self.index = []
+
+        header = json.dumps({
+            "version": VERSION,
+            "width": window[0],
+            "height": window[1],
+            "palette": Render.palette(family_colors).tolist(),
+        }).encode()
+
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def write_frame(self, frame, camera, display_type) -> None:
+        ''' Append a Captured Render.Frame as Seen through the Camera '''
+
+        i0, _, j0, _, block = frame.view
+        indices = Render.field_indices(frame, display_type, fill_life=True)
+        offset = (round((i0 - camera.x) * camera.zoom), round((j0 - camera.y) * camera.zoom))
+
+        self.write(frame.stats["day_counter"], sum(frame.stats["family_count"]), frame.stats["newborn_count"],
+                   indices, block * camera.zoom, offset)
+
+    def write(self, tick, families, newborns, indices, scale, offset) -> None:
+        ''' Append One Frame, Indices are Indexed [x, y] as in the Sector '''
+
+        if not self.frames:
+            self.chunk_tick = tick
+
+        width, height = indices.shape
+        self.frames.append(FRAME_HEADER.pack(tick, families, newborns, width, height, scale, *offset) +
+                           np.ascontiguousarray(indices.T, dtype=np.uint8).tobytes())
+
+        if len(self.frames) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.frames:
+            return
+
+        self.index.append((self.chunk_tick, self.file.tell()))
+        payload = zlib.compress(b"".join(self.frames), self.level)
+        self.file.write(struct.pack("<I", len(payload)) + payload)
+        self.frames = []
+
+    def close(self) -> None:
+        self.flush()
+
+        index_offset = self.file.tell()
+        self.file.write(struct.pack("<I", len(self.index)))
+        for tick, offset in self.index:
+            self.file.write(struct.pack("<IQ", tick, offset))
+        self.file.write(struct.pack("<Q", index_offset) + INDEX_MAGIC)
+        self.file.close()
+
+
+class FrameReader:
+    ''' Decodes a Frame File Back into Window-Sized RGB Images '''
+
+    def __init__(self, path):
+        with open(path, "rb") as frames:
+            self.data = frames.read()
+
+        if self.data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a frame file")
+
+        header_len, = struct.unpack_from("<I", self.data, 4)
+        self.header = json.loads(self.data[8:8 + header_len])
+        self.width = self.header["width"]
+        self.height = self.header["height"]
+        self.palette = np.array(self.header["palette"], dtype=np.uint8)
+        self.start = 8 + header_len
+
+    def chunks(self):
+        ''' Decompressed Chunks in Order, also of an Unfinished File '''
+
+        offset = self.start
+        end = len(self.data)
+        if self.data[-4:] == INDEX_MAGIC:
+            end, = struct.unpack_from("<Q", self.data, len(self.data) - 12)
+
+        while offset + 4 <= end:
+            length, = struct.unpack_from("<I", self.data, offset)
+            try:
+                yield zlib.decompress(self.data[offset + 4:offset + 4 + length])
+            except zlib.error:
+                return
+            offset += 4 + length
+
+    def frames(self):
+        ''' Yields (tick, family count, newborn count, window palette indices[height, width]) '''
+
+        for payload in self.chunks():
+            position = 0
+            while position < len(payload):
+                tick, families, newborns, width, height, scale, x, y = FRAME_HEADER.unpack_from(payload, position)
+                position += FRAME_HEADER.size
+
+                indices = np.frombuffer(payload, np.uint8, width * height, position).reshape(height, width)
+                position += width * height
+
+                yield tick, families, newborns, self.expand(indices, scale, x, y)
+
+    def expand(self, indices, scale, x, y) -> np.ndarray:
+        ''' Scale a Frame to the Window (Nearest Cell), Background Outside '''
+
+        cols = np.floor((np.arange(self.width) - x) / scale).astype(np.int64)
+        rows = np.floor((np.arange(self.height) - y) / scale).astype(np.int64)
+        col_ok = (cols >= 0) & (cols < indices.shape[1])
+        row_ok = (rows >= 0) & (rows < indices.shape[0])
+
+        window = indices[np.clip(rows, 0, indices.shape[0] - 1)][:, np.clip(cols, 0, indices.shape[1] - 1)]
+        window[~row_ok, :] = Render.BG_INDEX
+        window[:, ~col_ok] = Render.BG_INDEX
+
+        return window
+
+    def images(self):
+        ''' Yields (tick, family count, newborn count, RGB image[height, width, 3]) '''
+
+        for tick, families, newborns, window in self.frames():
+            yield tick, families, newborns, self.palette[window]
@@ -0,0 +1,344 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Local Job Queue for Simulation Runs (asyncio + SQLite)
+#
+#   python -m tools.jobs serve --workers 8
+#   python -m tools.jobs submit --kwargs '{"sector_size_x": 400, "families_count": 6}' --set tick=0
+#   python -m tools.jobs status [job]
+#   python -m tools.jobs cancel <job>
+#
+# Jobs take the kwargs of DNADialog.submit and run EvolutionGame.main in
+# their own process without a window, each in jobs/<id>/ (frames, video,
+# outcome.json, log). Crashed runs are retried, a cancelled run ends like a
+# closed window: its frames, outcome and video are still written.
+
+import os
+import sys
+import json
+import time
+import signal
+import sqlite3
+import asyncio
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DB_PATH = "jobs.sqlite"
+JOBS_DIR = "jobs"
+POLL_INTERVAL = 1.0         # Seconds between queue checks of the server
+PROGRESS_INTERVAL = 1.0     # Seconds between progress writes of a run
+CANCEL_GRACE = 30.0         # Seconds a cancelled run has to finish its video
+RETRY_DELAY = 5.0           # Seconds before a crashed run is retried, doubled per attempt
+MAX_ATTEMPTS = 3
+
+# Output kwargs of a job that are placed into its folder when relative
+JOB_PATHS = ("replay_path", "lineage_path", "frame_file", "memory_log")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kwargs TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    cancel REAL NOT NULL DEFAULT 0,
+    day INTEGER NOT NULL DEFAULT 0,
+    progress REAL NOT NULL DEFAULT 0,
+    folder TEXT,
+    pid INTEGER,
+    error TEXT,
+    not_before REAL NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+)
+"""
+
+
+def connect(db_path) -> sqlite3.Connection:
+    ''' Open (and Create) the Queue, Shared by Server, Runs and CLI '''
+
+    db = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(SCHEMA)
+    return db
+
+
+# Queue Operations (CLI Side)
+
+def submit(db, kwargs, max_attempts=MAX_ATTEMPTS) -> int:
+    cursor = db.execute("INSERT INTO jobs (kwargs, max_attempts, created) VALUES (?, ?, ?)",
+                        (json.dumps(kwargs), max_attempts, time.time()))
+    return cursor.lastrowid
+
+
+def cancel(db, job_id) -> str:
+    ''' Queued Jobs are Dropped, Running Ones Asked to End '''
+
+    db.execute("UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+               (time.time(), job_id))
+    db.execute("UPDATE jobs SET cancel = ? WHERE id = ? AND status = 'running' AND cancel = 0", (time.time(), job_id))
+
+    row = db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return row["status"] if row else None
+
+
+def print_status(db, job_id=None) -> None:
+    if job_id is not None:
+        row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            print(f"No job {job_id}")
+            return
+        for key in row.keys():
+            print(f"{key:13s} {row[key]}")
+        return
+
+    print(f"{'job':>5s} {'status':10s} {'try':>5s} {'day':>7s} {'done':>6s}  folder")
+    for row in db.execute("SELECT * FROM jobs ORDER BY id"):
+        status = row["status"] + ("*" if row["cancel"] and row["status"] == "running" else "")
+        print(f"{row['id']:5d} {status:10s} {row['attempts']:>2d}/{row['max_attempts']:<2d} "
+              f"{row['day']:7d} {row['progress']:6.0%}  {row['folder'] or ''}")
+
+
+# One Run (in its own process)
+
+def run_job(db_path, job_id) -> None:
+    ''' Runs EvolutionGame.main with the kwargs of the Job, no Window '''
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    import Constants
+    import EvolutionGame
+
+    db = connect(db_path)
+    row = db.execute("SELECT kwargs, folder FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    kwargs = json.loads(row["kwargs"])
+
+    kwargs["folder_path"] = os.path.join(row["folder"], "frames")
+    for key in JOB_PATHS:
+        if kwargs.get(key) and not os.path.isabs(kwargs[key]):
+            kwargs[key] = os.path.join(row["folder"], kwargs[key])
+
+    last_write = 0
+
+    def progress(day) -> bool:
+        ''' Store the Day now and then, True once the Job is Cancelled '''
+
+        nonlocal last_write
+        now = time.monotonic()
+        if now - last_write < PROGRESS_INTERVAL:
+            return False
+        last_write = now
+
+        db.execute("UPDATE jobs SET day = ?, progress = ? WHERE id = ?",
+                   (day, min(day / Constants.FINISH, 1), job_id))
+        return bool(db.execute("SELECT cancel FROM jobs WHERE id = ?", (job_id,)).fetchone()["cancel"])
+
+    # Nobody watches the run: it ends once settled, the video stays in the job folder
+    kwargs.setdefault("end_action", Constants.HEADLESS_END_ACTION)
+    EvolutionGame.main(**kwargs, progress=progress, open_video=False)
+
+    # The last progress write may be a second old, the outcome has the last day
+    outcome_path = os.path.join(kwargs["folder_path"], "outcome.json")
+    if os.path.exists(outcome_path):
+        with open(outcome_path) as outcome_file:
+            db.execute("UPDATE jobs SET day = ? WHERE id = ?", (json.load(outcome_file)["day"], job_id))
+
+
+# Server
+
+class JobServer:
+    ''' Keeps up to `workers` Runs Going, Each in a Subprocess '''
+
+    def __init__(self, db_path, jobs_dir=JOBS_DIR, workers=None):
+        self.db_path = os.path.abspath(db_path)
+        self.jobs_dir = os.path.abspath(jobs_dir)
+        self.workers = workers or os.cpu_count()
+        self.db = connect(db_path)
+
+        self.running = {}
+        self.stopping = False
+        # Runs the server itself ends when it stops, queued again after
+        self.interrupted = set()
+
+    def recover(self) -> None:
+        ''' Runs Left 'running' by a Server that Died Count as Crashed '''
+
+        for row in self.db.execute("SELECT id FROM jobs WHERE status = 'running'").fetchall():
+            self.finish(row["id"], crashed=True, error="server stopped during the run")
+
+    def claim(self):
+        ''' Mark the Next Due Job as Running (None if Nothing is Due) '''
+
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        row = self.db.execute("SELECT id FROM jobs WHERE status = 'queued' AND not_before <= ? ORDER BY id LIMIT 1",
+                              (now,)).fetchone()
+        if row is None:
+            self.db.execute("COMMIT")
+            return None
+
+        folder = os.path.join(self.jobs_dir, str(row["id"]))
+        self.db.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, folder = ?, started = ?, "
+                        "error = NULL WHERE id = ?", (folder, now, row["id"]))
+        self.db.execute("COMMIT")
+
+        os.makedirs(folder, exist_ok=True)
+        return row["id"], folder
+
+    def finish(self, job_id, crashed, error=None) -> None:
+        ''' Done, Cancelled, Retried after a Delay or Failed for Good '''
+
+        row = self.db.execute("SELECT attempts, max_attempts, cancel FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        if job_id in self.interrupted:
+            self.db.execute("UPDATE jobs SET attempts = attempts - 1, cancel = 0 WHERE id = ?", (job_id,))
+            status, not_before = "queued", 0
+        elif row["cancel"]:
+            status, not_before = "cancelled", 0
+        elif not crashed:
+            status, not_before = "done", 0
+        elif row["attempts"] < row["max_attempts"]:
+            status, not_before = "queued", time.time() + RETRY_DELAY * 2 ** (row["attempts"] - 1)
+        else:
+            status, not_before = "failed", 0
+
+        self.db.execute("UPDATE jobs SET status = ?, not_before = ?, error = ?, pid = NULL, finished = ?, "
+                        "progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END WHERE id = ?",
+                        (status, not_before, error, time.time(), status, job_id))
+        print(f"job {job_id}: {status}" + (f" ({error})" if error else ""), flush=True)
+
+    async def run(self, job_id, folder) -> None:
+        ''' One Attempt of a Job, Output Logged to its Folder '''
+
+        with open(os.path.join(folder, "run.log"), "ab") as log:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "tools.jobs", "--db", self.db_path, "run", str(job_id),
+                cwd=ROOT_DIR, stdout=log, stderr=asyncio.subprocess.STDOUT, start_new_session=True)
+
+            self.db.execute("UPDATE jobs SET pid = ? WHERE id = ?", (process.pid, job_id))
+            print(f"job {job_id}: running in {folder} (pid {process.pid})", flush=True)
+
+            code = await process.wait()
+
+        error = None
+        if code != 0:
+            with open(os.path.join(folder, "run.log"), "rb") as log:
+                tail = log.read().decode(errors="replace").strip().splitlines()[-1:]
+            error = f"exit code {code}" + (f": {tail[0][:200]}" if tail else "")
+
+        self.finish(job_id, crashed=code != 0, error=error)
+
+    def check_cancelled(self) -> None:
+        ''' Kill Cancelled Runs that did not End within the Grace Period '''
+
+        now = time.time()
+        for row in self.db.execute("SELECT id, pid, cancel FROM jobs WHERE status = 'running' AND cancel > 0").fetchall():
+            if row["id"] in self.running and row["pid"] and now - row["cancel"] > CANCEL_GRACE:
+                try:
+                    os.kill(row["pid"], signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    async def serve(self) -> None:
+        self.recover()
+        print(f"Serving {self.db_path} with {self.workers} workers, job folders in {self.jobs_dir}", flush=True)
+
+        while not self.stopping or self.running:
+            for job_id, task in list(self.running.items()):
+                if task.done():
+                    del self.running[job_id]
+                    if task.exception():
+                        print(f"job {job_id}: {task.exception()!r}", flush=True)
+
+            while not self.stopping and len(self.running) < self.workers:
+                claimed = self.claim()
+                if claimed is None:
+                    break
+                self.running[claimed[0]] = asyncio.create_task(self.run(*claimed))
+
+            self.check_cancelled()
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def stop(self) -> None:
+        ''' End the Current Runs like a Closed Window, they are Queued Again '''
+
+        self.stopping = True
+        for job_id in self.running:
+            self.interrupted.add(job_id)
+            self.db.execute("UPDATE jobs SET cancel = ? WHERE id = ?", (time.time(), job_id))
+
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Queue simulation runs and execute them in the background.")
+    parser.add_argument("--db", default=DB_PATH, help="Queue database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run queued jobs until interrupted")
+    serve_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    serve_parser.add_argument("--jobs-dir", default=JOBS_DIR)
+
+    submit_parser = commands.add_parser("submit", help="Queue a run")
+    submit_parser.add_argument("--kwargs", default="{}", help="JSON kwargs, as DNADialog.submit passes them")
+    submit_parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="One kwarg (JSON value)")
+    submit_parser.add_argument("--retries", type=int, default=MAX_ATTEMPTS - 1, help="Retries after a crash")
+    submit_parser.add_argument("--count", type=int, default=1, help="Queue this many copies")
+
+    status_parser = commands.add_parser("status", help="List the jobs, or show one")
+    status_parser.add_argument("job", type=int, nargs="?")
+
+    cancel_parser = commands.add_parser("cancel", help="Cancel a queued or running job")
+    cancel_parser.add_argument("job", type=int)
+
+    run_parser = commands.add_parser("run", help=argparse.SUPPRESS)
+    run_parser.add_argument("job", type=int)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run_job(args.db, args.job)
+        return
+
+    db = connect(args.db)
+
+    if args.command == "serve":
+        server = JobServer(args.db, args.jobs_dir, args.workers)
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(server.serve())
+        try:
+            loop.run_until_complete(task)
+        except KeyboardInterrupt:
+            print("Stopping: ending the current runs, they are queued again", flush=True)
+            server.stop()
+            loop.run_until_complete(task)
+        finally:
+            loop.close()
+
+    elif args.command == "submit":
+        kwargs = json.loads(args.kwargs)
+        for item in args.set:
+            key, _, value = item.partition("=")
+            kwargs[key] = parse_value(value)
+        for _ in range(args.count):
+            print(f"Queued job {submit(db, kwargs, args.retries + 1)}")
+
+    elif args.command == "status":
+        print_status(db, args.job)
+
+    elif args.command == "cancel":
+        status = cancel(db, args.job)
+        print(f"Job {args.job}: {status}" if status else f"No job {args.job}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import types
+import importlib
+
+
+class LazyModule(types.ModuleType):
+    ''' Placeholder that Imports the Real Module on First Attribute Access
+
+        After the first access the module namespace is copied in,
+        so later lookups cost the same as on the real module. '''
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_module(name) -> types.ModuleType:
+    ''' Defer a Heavy or Optional Import (GUI, Video) until it is Used '''
+
+    return LazyModule(name)
@@ -0,0 +1,283 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Lineage Log: One Row per Birth, Append-Only, One File per Column
+#
+#   run.lineage/
+#     header.json     fields, founder DNA per family, row count, column dtypes
+#     parent.i32      uid of the parent (-1 for the founders)
+#     tick.u32        step of the birth
+#     family.i16      family index
+#     type.i8         life code (Constants.LEAF .. PIPE), EMPTY for a birth
+#                     that found no room but still shifted the family DNA
+#     gene.i8         DNA field mutated at the birth (index into fields, -1 none)
+#     shift.f32       size of that mutation
+#     children.*      CSR index of the children, written after the run
+#
+# The uid of a life is its row. Rows are buffered in arrays and appended to
+# the column files in batches, and the header is rewritten after every batch;
+# the columns can be memory-mapped with numpy while or after the run (or after
+# a crash, up to the last batch).
+#
+#   python -m tools.lineage run.lineage
+#   python -m tools.lineage run.lineage --uid 1234
+
+import os
+import json
+import array
+import argparse
+from collections import Counter
+
+import numpy as np
+
+import Constants
+
+# Column name -> (array typecode of the write buffer, numpy dtype on disk)
+COLUMNS = {
+    "parent": ("i", np.int32),
+    "tick": ("I", np.uint32),
+    "family": ("h", np.int16),
+    "type": ("b", np.int8),
+    "gene": ("b", np.int8),
+    "shift": ("f", np.float32),
+}
+
+TYPE_NAMES = {Constants.EMPTY: "not placed", Constants.LEAF: "leaf", Constants.ROOT: "root",
+              Constants.RADIO: "radio", Constants.NEWBORN: "newborn", Constants.PIPE: "pipe"}
+
+
+def column_path(path, name) -> str:
+    return os.path.join(path, f"{name}.{np.dtype(COLUMNS[name][1]).str[1:]}")
+
+
+class LineageWriter:
+    ''' Buffers Births and Appends them to the Column Files in Batches '''
+
+    def __init__(self, path, batch=65536):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.batch = batch
+
+        self.files = {name: open(column_path(path, name), "wb") for name in COLUMNS}
+        self.buffers = {name: array.array(typecode) for name, (typecode, _) in COLUMNS.items()}
+        # Bound appends of the buffers, record() runs for every birth
+        self.appends = tuple(self.buffers[name].append for name in COLUMNS)
+
+        self.rows = 0
+        self.flushed = 0
+        self.tick = 0
+        self.founders = {}
+
+        self.write_header(closed=False)
+
+    def found(self, life) -> int:
+        ''' Record a Life Placed at the Start, Keeps its Family's DNA '''
+
+        self.founders[life.family_idx] = dict(life.dna.data) if life.dna else None
+        return self.record(-1, life, None)
+
+    def record(self, parent, life, delta, placed=True) -> int:
+        ''' Append One Birth, Returns the uid of the Life '''
+
+        add_parent, add_tick, add_family, add_type, add_gene, add_shift = self.appends
+        add_parent(parent)
+        add_tick(self.tick)
+        add_family(life.family_idx)
+        add_type(life.code if placed else Constants.EMPTY)
+        if delta is None:
+            add_gene(-1)
+            add_shift(0.0)
+        else:
+            add_gene(delta[0])
+            add_shift(delta[1])
+
+        uid = self.rows
+        self.rows += 1
+        if len(self.buffers["tick"]) >= self.batch:
+            self.flush()
+
+        return uid
+
+    def buffer_size(self) -> int:
+        return sum(len(buffer) * buffer.itemsize for buffer in self.buffers.values())
+
+    def flush(self) -> None:
+        for name, buffer in self.buffers.items():
+            buffer.tofile(self.files[name])
+            del buffer[:]
+            self.files[name].flush()
+
+        # Columns first, so the header never counts rows that are not on disk
+        self.flushed = self.rows
+        self.write_header(closed=False)
+
+    def write_header(self, closed) -> None:
+        ''' Replace the Header in One Step, a Reader Sees the Old or the New One '''
+
+        path = os.path.join(self.path, "header.json")
+        with open(path + ".tmp", "w") as header:
+            json.dump({
+                "rows": self.flushed,
+                "closed": closed,
+                "fields": list(Constants.fields),
+                "founders": {str(family): dna for family, dna in sorted(self.founders.items())},
+                "columns": {name: np.dtype(dtype).str for name, (_, dtype) in COLUMNS.items()},
+            }, header, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def close(self) -> None:
+        self.flush()
+        for file in self.files.values():
+            file.close()
+
+        self.write_header(closed=True)
+
+
+class LineageReader:
+    ''' Memory-Mapped Columns of a Lineage Log & Ancestry Queries '''
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(os.path.join(path, "header.json")) as header:
+            self.header = json.load(header)
+        self.fields = self.header["fields"]
+        self.rows = self.header["rows"]
+        # False while the run goes on (or after a crash): rows up to the last batch
+        self.closed = self.header.get("closed", True)
+
+        for name, (_, dtype) in COLUMNS.items():
+            setattr(self, name, self.load(column_path(path, name), dtype, self.rows))
+
+        self.offsets = None
+        self.children_uids = None
+
+    @staticmethod
+    def load(path, dtype, rows) -> np.ndarray:
+        # np.memmap refuses empty files
+        if not rows:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+    def index(self) -> None:
+        ''' CSR Index of the Children, Built Once and Kept Next to the Columns
+            children of uid = children_uids[offsets[uid]:offsets[uid + 1]]
+
+            The index of an unfinished log is only kept in memory, the log
+            still grows. '''
+
+        offsets_path = os.path.join(self.path, "children.offsets.i64")
+        uids_path = os.path.join(self.path, "children.uids.i32")
+
+        if self.closed and os.path.exists(offsets_path):
+            self.offsets = self.load(offsets_path, np.int64, self.rows + 1)
+            self.children_uids = self.load(uids_path, np.int32, self.rows - int((np.asarray(self.parent) < 0).sum()))
+            return
+
+        parent = np.asarray(self.parent)
+        born = np.flatnonzero(parent >= 0)
+        # A stable sort keeps the children of a parent in birth order
+        self.children_uids = born[np.argsort(parent[born], kind="stable")].astype(np.int32)
+        self.offsets = np.zeros(self.rows + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum(np.bincount(parent[born], minlength=self.rows))
+
+        if self.closed:
+            self.offsets.tofile(offsets_path)
+            self.children_uids.tofile(uids_path)
+
+    def children(self, uid) -> np.ndarray:
+        if self.offsets is None:
+            self.index()
+        return np.asarray(self.children_uids[self.offsets[uid]:self.offsets[uid + 1]])
+
+    def ancestors(self, uid) -> list:
+        ''' uids from the Parent up to the Founder '''
+
+        line = []
+        uid = int(self.parent[uid])
+        while uid >= 0:
+            line.append(uid)
+            uid = int(self.parent[uid])
+
+        return line
+
+    def descendants(self, uid) -> np.ndarray:
+        ''' uids of Every Life Descending from uid, Generation by Generation '''
+
+        if self.offsets is None:
+            self.index()
+
+        found = []
+        generation = np.array([uid], dtype=np.int64)
+        while len(generation):
+            starts, ends = self.offsets[generation], self.offsets[generation + 1]
+            counts = ends - starts
+            if not counts.sum():
+                break
+            # Ranges [start, end) of every parent of the generation at once
+            positions = np.repeat(ends - counts.cumsum(), counts) + np.arange(counts.sum())
+            generation = np.asarray(self.children_uids[positions], dtype=np.int64)
+            found.append(generation)
+
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+    def drift(self, uid) -> dict:
+        ''' DNA Mutations along the Line of a Life, Summed per Field
+
+            A family shares one DNA object, so the DNA of the family at a
+            tick is its founder DNA plus every shift of the family up to
+            then (family_dna); this is the part of it drawn by the ancestors
+            of uid. '''
+
+        line = np.array([uid] + self.ancestors(uid), dtype=np.int64)
+        genes = np.asarray(self.gene)[line]
+        shifts = np.asarray(self.shift)[line].astype(np.float64)
+
+        totals = np.bincount(genes[genes >= 0], weights=shifts[genes >= 0], minlength=len(self.fields))
+        return dict(zip(self.fields, totals.tolist()))
+
+    def family_dna(self, family, tick=None) -> dict:
+        ''' DNA of a Family after a Step (the Last Logged One by Default) '''
+
+        rows = (np.asarray(self.family) == family) & (np.asarray(self.gene) >= 0)
+        if tick is not None:
+            rows &= np.asarray(self.tick) <= tick
+
+        genes = np.asarray(self.gene)[rows]
+        shifts = np.asarray(self.shift)[rows].astype(np.float64)
+        totals = np.bincount(genes, weights=shifts, minlength=len(self.fields))
+
+        founder = self.header["founders"][str(family)]
+        return {field: founder[field] + shift for field, shift in zip(self.fields, totals.tolist())}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize a lineage log and query the ancestry of a life.")
+    parser.add_argument("path", help="Lineage log folder (lineage_path of the run)")
+    parser.add_argument("--uid", type=int, help="Print the ancestry of this life")
+    args = parser.parse_args()
+
+    log = LineageReader(args.path)
+    log.index()
+
+    placed = np.asarray(log.type) != Constants.EMPTY
+    print(f"{int(placed.sum())} births over {int(log.tick.max()) + 1 if log.rows else 0} steps"
+          f"{'' if log.closed else ' (run unfinished, up to the last batch)'}")
+    families = Counter(np.asarray(log.family)[placed].tolist())
+    types = Counter(np.asarray(log.type).tolist())
+    print("per family: " + ", ".join(f"{family}: {count}" for family, count in sorted(families.items())))
+    print("per type:   " + ", ".join(f"{TYPE_NAMES.get(code, code)}: {count}" for code, count in sorted(types.items())))
+    print(f"mutations:  {int((np.asarray(log.gene) >= 0).sum())}")
+
+    if args.uid is not None:
+        line = log.ancestors(args.uid)
+        print(f"\nlife {args.uid}: {TYPE_NAMES.get(int(log.type[args.uid]))} of family {int(log.family[args.uid])}, "
+              f"born at step {int(log.tick[args.uid])}")
+        print(f"  {len(line)} ancestors, founder {line[-1] if line else args.uid}")
+        print(f"  {len(log.children(args.uid))} children, {len(log.descendants(args.uid))} descendants")
+        for field, shift in log.drift(args.uid).items():
+            print(f"  {field:14s} {shift:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Memory Accounting of a Running Sector
+#
+# Every few steps: process memory, Life objects on the grid and alive in the
+# interpreter (the difference is what is kept alive off the grid), DNA
+# objects, grid & frame buffer sizes and the top tracemalloc allocators.
+
+import gc
+import sys
+import json
+import time
+import collections
+import tracemalloc
+
+import Life
+from tools.telemetry import memory_usage
+
+MB = 1024 * 1024
+
+
+class MemoryWatch:
+    ''' Periodic Memory Report with an Optional Budget
+
+        Reports go to stdout and, with a log path, as JSON lines to a file.
+        Past the budget the watch warns (once per crossing) or flags an
+        abort, which the caller turns into the end of the run. '''
+
+    def __init__(self, every=100, budget_mb=None, action="warn", top=10, log_path=None):
+        self.every = every
+        self.budget = budget_mb * MB if budget_mb else None
+        self.action = action
+        self.top = top
+        self.log_path = log_path
+
+        self.over_budget = False
+        self.abort = False
+        self.reports = []
+
+        if self.top and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        if self.top and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def due(self, step) -> bool:
+        return bool(self.every) and step % self.every == 0
+
+    def check(self, sector, buffers=None):
+        ''' Report if Due this Step (None otherwise), Checks the Budget '''
+
+        if not self.due(sector.step_count):
+            return None
+
+        report = self.report(sector, buffers or {})
+        self.reports.append(report)
+        self.print_report(report)
+
+        if self.log_path:
+            with open(self.log_path, "a") as log:
+                log.write(json.dumps(report) + "\n")
+
+        rss = report["rss"]
+        over = self.budget is not None and rss is not None and rss > self.budget
+        if over and not self.over_budget:
+            print(f"Memory budget exceeded: {rss / MB:.0f} MB > {self.budget / MB:.0f} MB"
+                  + (", ending the run" if self.action == "abort" else ""), file=sys.stderr)
+        self.over_budget = over
+        self.abort = over and self.action == "abort"
+
+        return report
+
+    def report(self, sector, buffers) -> dict:
+        world = sector.world
+
+        # Life & DNA objects on the grid and anywhere in the interpreter
+
+        on_grid = collections.Counter()
+        grid_dna = set()
+        for cell in world.cells.values():
+            if cell.occupied:
+                on_grid[type(cell.occupied).__name__] += 1
+                if cell.occupied.dna is not None:
+                    grid_dna.add(id(cell.occupied.dna))
+
+        tracked = collections.Counter()
+        dna_objects = 0
+        for obj in gc.get_objects():
+            if isinstance(obj, Life.Life):
+                tracked[type(obj).__name__] += 1
+            elif isinstance(obj, Life.DNA):
+                dna_objects += 1
+
+        report = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "step": sector.step_count,
+            "day": sector.day_counter,
+            "rss": memory_usage(),
+            "life_on_grid": dict(on_grid),
+            "life_objects": dict(tracked),
+            "life_off_grid": sum(tracked.values()) - sum(on_grid.values()),
+            "dna_objects": dna_objects,
+            "dna_on_grid": len(grid_dna),
+            "grid_bytes": world.memory_size(),
+            "cells": len(world.cells),
+            "chunks": len(world.chunks),
+            "buffers": {name: int(size) for name, size in buffers.items()},
+        }
+
+        if self.top and tracemalloc.is_tracing():
+            stats = tracemalloc.take_snapshot().statistics("lineno")[:self.top]
+            report["top_allocators"] = [
+                {"where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size, "blocks": stat.count}
+                for stat in stats
+            ]
+
+        return report
+
+    def print_report(self, report) -> None:
+        rss = f"{report['rss'] / MB:.0f} MB" if report["rss"] is not None else "unknown"
+        print(f"[memory] day {report['day']} step {report['step']}: rss {rss}, "
+              f"grid {report['grid_bytes'] / MB:.1f} MB in {report['chunks']} chunks / {report['cells']} cells, "
+              f"life {sum(report['life_on_grid'].values())} on grid + {report['life_off_grid']} off grid, "
+              f"DNA {report['dna_objects']} ({report['dna_on_grid']} on grid)")
+
+        for name, size in report["buffers"].items():
+            print(f"[memory]   {name}: {size / MB:.1f} MB")
+        for stat in report.get("top_allocators", []):
+            print(f"[memory]   {stat['bytes'] / 1024:9.1f} KB  {stat['blocks']:7d} blocks  {stat['where']}")
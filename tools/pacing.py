@@ -0,0 +1,104 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Fast-Forward Pacing: Simulation Rate & Frame Saving Cadence
+
+import time
+
+
+class StepPacer:
+    ''' Simulation Rate: K Steps per Frame at the TICK Frame Rate, or Unbounded
+
+        The simulation runs on its own thread and never waits for drawing,
+        the pacer only caps how fast it steps so the game stays watchable.
+        With a render-rate target K adapts instead: the steps of a frame
+        get what is left of the frame budget after drawing (both measured
+        and smoothed), since steps running flat out starve the window of
+        the interpreter. Without a fixed count or target (K = 0) it runs at
+        full speed. '''
+
+    def __init__(self, steps=1, frame_rate=60, max_steps=1000, target_fps=None, smoothing=0.2):
+        self.steps = max(0, int(steps))
+        self.frame_rate = frame_rate
+        self.max_steps = max_steps
+        self.target_fps = target_fps
+        self.smoothing = smoothing
+
+        self.step_time = None
+        self.render_time = 0.0
+
+    @property
+    def adaptive(self) -> bool:
+        return bool(self.target_fps)
+
+    @property
+    def unbounded(self) -> bool:
+        return not self.adaptive and (not self.steps or not self.frame_rate)
+
+    def interval(self) -> float:
+        ''' Seconds between Two Steps, 0 when Unbounded '''
+
+        if self.adaptive:
+            return 1 / (self.target_fps * max(self.steps, 1))
+        if self.unbounded:
+            return 0.0
+        return 1 / (self.frame_rate * self.steps)
+
+    def record_step(self, seconds) -> None:
+        ''' Measured Cost of One Step (Simulation Thread) '''
+
+        if self.step_time is None:
+            self.step_time = seconds
+        else:
+            self.step_time += self.smoothing * (seconds - self.step_time)
+
+    def record_frame(self, seconds) -> None:
+        ''' Measured Cost of Drawing One Frame (GUI Thread), Updates K '''
+
+        self.render_time += self.smoothing * (seconds - self.render_time)
+
+        if not self.adaptive or not self.step_time:
+            return
+
+        budget = 1 / self.target_fps - self.render_time
+        wanted = int(budget / self.step_time) if budget > 0 else 1
+
+        # Grow at most twice per frame, a single slow step must not stall the GUI
+        self.steps = max(1, min(wanted, max(self.steps, 1) * 2, self.max_steps))
+
+    def faster(self) -> None:
+        self.target_fps = None
+        self.steps = min(max(self.steps, 1) * 2, self.max_steps)
+
+    def slower(self) -> None:
+        self.target_fps = None
+        self.steps = max(1, self.steps // 2)
+
+
+class SaveSchedule:
+    ''' When to Save a Frame to the Output Folder
+
+        Frames are saved every N simulation steps, or at a steady rate of
+        saved frames per wall-clock second (so the video keeps the pace the
+        window showed), and never before the fast-forward day. '''
+
+    def __init__(self, every=1, fps=None, start_day=0, clock=time.perf_counter):
+        self.every = max(1, int(every)) if every else None
+        self.fps = fps
+        self.start_day = start_day
+        self.clock = clock
+
+        self.last_saved = None
+
+    def due(self, step, day) -> bool:
+        if day < self.start_day:
+            return False
+
+        if self.fps:
+            now = self.clock()
+            if self.last_saved is not None and now - self.last_saved < 1 / self.fps:
+                return False
+            self.last_saved = now
+            return True
+
+        return self.every is not None and step % self.every == 0
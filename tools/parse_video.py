@@ -9,7 +9,7 @@ import subprocess
 CURRENT_DIR = os.path.dirname(__file__)
 
 
-def combine_images_to_video(folder_path, video_filename):
+def combine_images_to_video(folder_path, video_filename, open_after=True):
     image_filenames = sorted([os.path.join(folder_path, filename) for filename in os.listdir(folder_path) if filename.endswith('.png')])
     
     if not image_filenames:
@@ -28,8 +28,44 @@ def combine_images_to_video(folder_path, video_filename):
 
     video_writer.release()
     print(f"Proccess completed! Video saved as {video_filename}")
+    if open_after:
+        open_video(video_filename)
+
+
+def combine_frames_to_video(frame_path, video_filename, open_after=True):
+    ''' Same Video from a Palette-Indexed Frame File (tools/frames.py) '''
+
+    from tools.frames import FrameReader
+
+    reader = FrameReader(frame_path)
+    fourcc = cv2.VideoWriter_fourcc(*'MP4V')
+    video_writer = cv2.VideoWriter(video_filename, fourcc, 10, (reader.width, reader.height))
+
+    written = 0
+    for _, families, newborns, image in reader.images():
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+
+        # General Survival Information Board
+        cv2.putText(image, f"Newborn Cell Count: {newborns}", (10, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        cv2.putText(image, f"Family Count: {families}", (10, 36), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+
+        video_writer.write(image)
+        written += 1
+
+    video_writer.release()
+
+    if not written:
+        print("No frames found in the file.")
+        return
+
+    print(f"Proccess completed! Video saved as {video_filename}")
+    if open_after:
+        open_video(video_filename)
+
+
+def open_video(video_filename):
+    ''' Open the Video File Using Default Player '''
 
-    # Open the video file using default player
     if platform.system() == 'Windows':
         os.startfile(video_filename)
     elif platform.system() == 'Darwin':  # ahndle macOS
@@ -0,0 +1,300 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+# Replay File Layout (little-endian)
+#
+#   "CEVR" | u32 header length | JSON header
+#   chunks:  u32 compressed length | zlib(frames)
+#   index:   u32 chunk count | (u32 first tick, u64 offset) per chunk
+#   footer:  u64 index offset | "CEVI"
+#
+# Every chunk starts with a keyframe, so any chunk decodes on its own.
+# A frame is u8 kind | u32 tick followed by
+#   keyframe: LAYERS x width*height bytes
+#   delta:    u32 count | varint gaps of changed cell indices | LAYERS x count bytes
+# Layers are stored row-major (index = y * width + x):
+#   type code, family + 1 (0 = none), direction, organic (0-255), energy (0-255)
+
+import json
+import zlib
+import struct
+
+import numpy as np
+
+import Constants
+
+
+MAGIC = b"CEVR"
+INDEX_MAGIC = b"CEVI"
+VERSION = 1
+LAYERS = ("type", "family", "direction", "organic", "energy")
+KEYFRAME, DELTA = 0, 1
+# Families are stored as family + 1 in one byte, 0 is no family
+MAX_FAMILIES = 254
+
+
+def encode_varints(values) -> bytes:
+    ''' LEB128 Encoding of Non-negative Integers (up to 2^35) '''
+
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 5):
+        sizes += values >= (1 << (7 * k))
+
+    out = np.zeros(int(sizes.sum()), dtype=np.uint8)
+    starts = np.cumsum(sizes) - sizes
+    for k in range(5):
+        sel = sizes > k
+        byte = (values[sel] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (sizes[sel] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[sel] + k] = byte | more
+
+    return out.tobytes()
+
+
+def decode_varints(buffer, offset, count) -> tuple:
+    ''' Inverse of encode_varints, Returns (values, next offset) '''
+
+    if count == 0:
+        return np.zeros(0, dtype=np.int64), offset
+
+    # A value takes at most 5 bytes, the rest of the buffer is not scanned
+    data = np.frombuffer(buffer, dtype=np.uint8, count=min(5 * count, len(buffer) - offset), offset=offset)
+    ends = np.flatnonzero(data < 0x80)[:count]
+    starts = np.concatenate(([0], ends[:-1] + 1))
+
+    values = np.zeros(count, dtype=np.uint64)
+    for k in range(5):
+        sel = starts + k <= ends
+        values[sel] |= (data[starts[sel] + k] & 0x7F).astype(np.uint64) << np.uint64(7 * k)
+
+    return values.astype(np.int64), offset + int(ends[-1]) + 1
+
+
+def quantize(field) -> np.ndarray:
+    return (np.clip(field, 0, 1) * 255 + 0.5).astype(np.uint8)
+
+
+def encode_layer(name, values) -> np.ndarray:
+    ''' Stored Bytes of a Layer (see the layout above) '''
+
+    if name == "family":
+        return (np.asarray(values) + 1).astype(np.uint8)
+    if name in ("organic", "energy"):
+        return quantize(values)
+    return np.asarray(values).astype(np.uint8)
+
+
+class ReplayWriter:
+    ''' Records a Sector Run as Delta-Encoded, Compressed Chunks
+
+        The world is read chunk by chunk and never assembled: deltas only
+        compare the chunks that stepped (or settled) since the last tick
+        with their previous bytes, keyframes are streamed into the
+        compressor one band of rows at a time. '''
+
+    def __init__(self, path, width, height, families, keyframe_interval=60, level=9, band=64):
+        if families > MAX_FAMILIES:
+            raise ValueError(f"A replay holds at most {MAX_FAMILIES} families, the sector has {families}")
+
+        self.file = open(path, "wb")
+        self.width = width
+        self.height = height
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self.band = band
+
+        # Stored bytes of every allocated chunk at the last tick, by chunk key
+        self.previous = {}
+        self.compressor = None
+        self.compressed = []
+        self.frames_in_chunk = 0
+        self.chunk_tick = 0
+        self.index = []
+
+        header = json.dumps({
+            "version": VERSION,
+            "width": width,
+            "height": height,
+            "cell_size": Constants.CELL_SIZE,
+            "keyframe_interval": keyframe_interval,
+            "layers": LAYERS,
+            "families": {str(idx): color for idx, color in Constants.COLONIES_COLOR.items()},
+            "colors": {
+                "background": Constants.BG,
+                "leaf": Constants.GREEN,
+                "root": Constants.BROWN,
+                "radio": Constants.BLUE,
+                "newborn": Constants.WHITE,
+                "organic_toxic": Constants.ORGANIC_TOXIC,
+                "energic_toxic": Constants.ENERGIC_TOXIC,
+            },
+            "thresholds": {
+                "organic": int(quantize(Constants.ORGANIC_THRESHOLD)),
+                "energy": int(quantize(Constants.ENERGY_THRESHOLD)),
+            },
+        }).encode()
+
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def write_sector(self, sector) -> None:
+        ''' Append One Tick of the Sector World '''
+
+        world = sector.world
+        # Chunks settled after the last tick may have changed in its step
+        recent = world.take_settled()
+
+        if self.frames_in_chunk >= self.keyframe_interval:
+            self.flush()
+
+        if self.compressor is None:
+            self.write_keyframe(sector.day_counter, world)
+        else:
+            chunks = {chunk.key: chunk for chunk in world.active_chunks()}
+            chunks.update((key, world.chunks[key]) for key in recent)
+            self.write_delta(sector.day_counter, world, chunks.values())
+
+        self.frames_in_chunk += 1
+
+    def chunk_state(self, chunk) -> np.ndarray:
+        ''' Stored Bytes of a Chunk, (LAYERS, cells) in Row-Major [y, x] Order '''
+
+        return np.stack([encode_layer(name, getattr(chunk, name).T) for name in LAYERS]).reshape(len(LAYERS), -1)
+
+    def write_keyframe(self, tick, world) -> None:
+        self.chunk_tick = tick
+        self.append(struct.pack("<BI", KEYFRAME, tick))
+
+        for name in LAYERS:
+            for j0 in range(0, self.height, self.band):
+                band = world.window(name, 0, self.width, j0, min(j0 + self.band, self.height))
+                self.append(np.ascontiguousarray(encode_layer(name, band.T)).tobytes())
+
+        self.previous = {key: self.chunk_state(chunk) for key, chunk in world.chunks.items()}
+
+    def write_delta(self, tick, world, chunks) -> None:
+        # Chunks allocated since the keyframe were at their default values
+        defaults = np.array([encode_layer(name, world.defaults[name]) for name in LAYERS], dtype=np.uint8)[:, None]
+
+        keys, values = [np.zeros(0, dtype=np.int64)], [np.zeros((len(LAYERS), 0), dtype=np.uint8)]
+        for chunk in chunks:
+            state = self.chunk_state(chunk)
+            previous = self.previous.get(chunk.key, defaults)
+            changed = np.flatnonzero((state != previous).any(axis=0))
+            self.previous[chunk.key] = state
+            if not len(changed):
+                continue
+
+            i0, j0 = chunk.origin
+            rows, cols = divmod(changed, chunk.shape[0])
+            keys.append((j0 + rows) * self.width + i0 + cols)
+            values.append(state[:, changed])
+
+        keys = np.concatenate(keys)
+        order = np.argsort(keys)
+        keys, values = keys[order], np.concatenate(values, axis=1)[:, order]
+
+        self.append(struct.pack("<BII", DELTA, tick, len(keys)) + encode_varints(np.diff(keys, prepend=0)) +
+                    np.ascontiguousarray(values).tobytes())
+
+    def append(self, data) -> None:
+        if self.compressor is None:
+            self.compressor = zlib.compressobj(self.level)
+        self.compressed.append(self.compressor.compress(data))
+
+    def buffer_size(self) -> int:
+        return sum(len(data) for data in self.compressed) + sum(state.nbytes for state in self.previous.values())
+
+    def flush(self) -> None:
+        ''' Finish the Pending Frames as a Chunk, Next Frame is a Keyframe '''
+
+        if self.compressor is None:
+            return
+
+        self.index.append((self.chunk_tick, self.file.tell()))
+        payload = b"".join(self.compressed) + self.compressor.flush()
+        self.file.write(struct.pack("<I", len(payload)) + payload)
+
+        self.compressor = None
+        self.compressed = []
+        self.frames_in_chunk = 0
+        self.previous = {}
+
+    def close(self) -> None:
+        self.flush()
+
+        index_offset = self.file.tell()
+        self.file.write(struct.pack("<I", len(self.index)))
+        for tick, offset in self.index:
+            self.file.write(struct.pack("<IQ", tick, offset))
+        self.file.write(struct.pack("<Q", index_offset) + INDEX_MAGIC)
+        self.file.close()
+
+
+class ReplayReader:
+    ''' Decodes a Replay File Back into Per-Tick Layer Arrays '''
+
+    def __init__(self, path):
+        with open(path, "rb") as replay:
+            self.data = replay.read()
+
+        if self.data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+
+        header_len, = struct.unpack_from("<I", self.data, 4)
+        self.header = json.loads(self.data[8:8 + header_len])
+        self.width = self.header["width"]
+        self.height = self.header["height"]
+        self.start = 8 + header_len
+        self.index = self.read_index()
+
+    def read_index(self) -> list:
+        ''' Chunk (first tick, offset) Pairs, Rebuilt by Scanning if Unfinished '''
+
+        if self.data[-4:] == INDEX_MAGIC:
+            index_offset, = struct.unpack_from("<Q", self.data, len(self.data) - 12)
+            count, = struct.unpack_from("<I", self.data, index_offset)
+            return [struct.unpack_from("<IQ", self.data, index_offset + 4 + 12 * i) for i in range(count)]
+
+        index, offset = [], self.start
+        while offset + 4 <= len(self.data):
+            length, = struct.unpack_from("<I", self.data, offset)
+            try:
+                payload = zlib.decompress(self.data[offset + 4:offset + 4 + length])
+            except zlib.error:
+                break
+            index.append((struct.unpack_from("<I", payload, 1)[0], offset))
+            offset += 4 + length
+
+        return index
+
+    def frames(self, from_tick=0):
+        ''' Yields (tick, layers) with layers shaped (LAYERS, height, width)
+
+            The layers array is reused between ticks, copy it to keep it. '''
+
+        cells = self.width * self.height
+        first = max([i for i, (tick, _) in enumerate(self.index) if tick <= from_tick], default=0)
+
+        for _, offset in self.index[first:]:
+            length, = struct.unpack_from("<I", self.data, offset)
+            payload = zlib.decompress(self.data[offset + 4:offset + 4 + length])
+
+            position, state = 0, None
+            while position < len(payload):
+                kind, tick = struct.unpack_from("<BI", payload, position)
+                position += 5
+
+                if kind == KEYFRAME:
+                    size = len(LAYERS) * cells
+                    state = np.frombuffer(payload, np.uint8, size, position).reshape(len(LAYERS), cells).copy()
+                    position += size
+                else:
+                    count, = struct.unpack_from("<I", payload, position)
+                    gaps, position = decode_varints(payload, position + 4, count)
+                    values = np.frombuffer(payload, np.uint8, len(LAYERS) * count, position)
+                    state[:, np.cumsum(gaps)] = values.reshape(len(LAYERS), count)
+                    position += len(LAYERS) * count
+
+                if tick >= from_tick:
+                    yield tick, state.reshape(len(LAYERS), self.height, self.width)
@@ -0,0 +1,211 @@
+# Developed by Anton Melnychuk          March 1st 2024
+# For ASTR 330 Class                    Yale University
+
+import os
+import sys
+import time
+import zlib
+import struct
+import threading
+import collections
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+def memory_usage() -> int:
+    ''' Resident Memory of the Process in Bytes (None if Unknown) '''
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # Peak usage: KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def encode_png(pixels) -> bytes:
+    ''' Encode an (height, width, 3) uint8 Array as a PNG File '''
+
+    height, width, _ = pixels.shape
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + \
+            struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    # Every scanline starts with filter type 0 (None)
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = pixels.reshape(height, width * 3)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + \
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)) + chunk(b"IEND", b"")
+
+
+class Telemetry:
+    ''' Local HTTP Endpoint with Live Run Metrics and a Frame Preview
+
+        The simulation thread only hands over references (publish) and,
+        when a preview was requested, the raw bytes of the last frame.
+        Rates, memory, downscaling and encoding run on the server thread. '''
+
+    def __init__(self, port, host="127.0.0.1", preview_width=240):
+        self.host = host
+        self.port = port
+        self.preview_width = preview_width
+
+        self.state = None
+        self.steps = 0
+        self.samples = collections.deque(maxlen=32)
+
+        self.frame = None
+        self.frame_wanted = threading.Event()
+        self.frame_ready = threading.Event()
+
+        self.server = None
+        self.thread = None
+
+    def start(self) -> None:
+        ''' Serve on a Daemon Thread so it Never Blocks Exit '''
+
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = telemetry.render_metrics().encode()
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path.startswith("/preview.png"):
+                    body = telemetry.render_preview()
+                    content_type = "image/png"
+                    if body is None:
+                        self.send_error(503, "No frame rendered yet")
+                        return
+                elif self.path == "/":
+                    body = INDEX_PAGE.encode()
+                    content_type = "text/html"
+                else:
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="telemetry", daemon=True)
+        self.thread.start()
+        print(f"Telemetry available at http://{self.host}:{self.port}/")
+
+    def stop(self) -> None:
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+    # Simulation Side (cheap handoff)
+
+    def publish(self, tick, population, newborns) -> None:
+        ''' Hand Over the Stats of the Finished Step '''
+
+        self.steps += 1
+        self.state = (tick, population, newborns)
+        self.samples.append((self.steps, time.perf_counter()))
+
+    def wants_frame(self) -> bool:
+        return self.frame_wanted.is_set()
+
+    def publish_frame(self, width, height, rgb_bytes) -> None:
+        ''' Hand Over the Raw RGB Bytes of the Latest Frame '''
+
+        self.frame = (width, height, rgb_bytes)
+        self.frame_wanted.clear()
+        self.frame_ready.set()
+
+
+    # Server Side
+
+    def steps_per_second(self) -> float:
+        samples = list(self.samples)
+        if len(samples) < 2 or samples[-1][1] == samples[0][1]:
+            return 0.0
+
+        (first_step, first_time), (last_step, last_time) = samples[0], samples[-1]
+        return (last_step - first_step) / (last_time - first_time)
+
+    def render_metrics(self) -> str:
+        ''' Prometheus-style Text Exposition '''
+
+        lines = []
+
+        def metric(name, kind, help_text, values):
+            lines.append(f"# HELP evolution_{name} {help_text}")
+            lines.append(f"# TYPE evolution_{name} {kind}")
+            for labels, value in values:
+                lines.append(f"evolution_{name}{labels} {value}")
+
+        state = self.state
+        if state is not None:
+            tick, population, newborns = state
+            metric("tick", "gauge", "Current day counter of the sector.", [("", tick)])
+            metric("steps_total", "counter", "Simulation steps executed.", [("", self.steps)])
+            metric("steps_per_second", "gauge", "Recent simulation speed.",
+                   [("", round(self.steps_per_second(), 3))])
+            metric("family_population", "gauge", "Living cells per family.",
+                   [(f'{{family="{idx}"}}', int(count)) for idx, count in enumerate(population)])
+            metric("newborn_count", "gauge", "Newborn cells in the last step.", [("", newborns)])
+
+        rss = memory_usage()
+        if rss is not None:
+            metric("memory_rss_bytes", "gauge", "Resident memory of the process.", [("", rss)])
+
+        return "\n".join(lines) + "\n"
+
+    def render_preview(self, timeout=2.0) -> bytes:
+        ''' Ask the Render Loop for its Next Frame and Downscale it Here '''
+
+        self.frame_ready.clear()
+        self.frame_wanted.set()
+        self.frame_ready.wait(timeout)
+
+        if self.frame is None:
+            return None
+
+        width, height, rgb_bytes = self.frame
+        pixels = np.frombuffer(rgb_bytes, dtype=np.uint8).reshape(height, width, 3)
+
+        step = max(1, -(-width // self.preview_width))
+        return encode_png(np.ascontiguousarray(pixels[::step, ::step]))
+
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Evolution Game - Live</title></head>
+<body style="background:#000;color:#eee;font-family:monospace">
+<img id="preview" src="/preview.png">
+<pre id="metrics"></pre>
+<script>
+setInterval(async () => {
+    document.getElementById("preview").src = "/preview.png?" + Date.now();
+    document.getElementById("metrics").textContent = await (await fetch("/metrics")).text();
+}, 2000);
+</script>
+</body>
+</html>
+"""
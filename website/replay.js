@@ -0,0 +1,250 @@
+// Developed by Anton Melnychuk          March 1st 2024
+// For ASTR 330 Class                    Yale University
+
+// Decoder & Canvas Player for Evolution Game Replays (tools/replay.py)
+
+const MAGIC = "CEVR";
+const INDEX_MAGIC = "CEVI";
+const KEYFRAME = 0;
+const TYPE = 0, FAMILY = 1, DIRECTION = 2, ORGANIC = 3, ENERGY = 4;
+const LAYERS = 5;
+const LEAF = 1, ROOT = 2, RADIO = 3, NEWBORN = 4, PIPE = 5;
+
+function ascii(bytes) {
+    return String.fromCharCode(...bytes);
+}
+
+async function inflate(bytes) {
+    // "deflate" in the Compression Streams API is the zlib format
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("deflate"));
+    return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+function readVarints(bytes, offset, count) {
+    const values = new Uint32Array(count);
+    for (let i = 0; i < count; i++) {
+        let value = 0, shift = 0, byte;
+        do {
+            byte = bytes[offset++];
+            value += (byte & 0x7f) * 2 ** shift;
+            shift += 7;
+        } while (byte & 0x80);
+        values[i] = value;
+    }
+    return [values, offset];
+}
+
+class Replay {
+    static async load(buffer) {
+        const replay = new Replay(buffer);
+        await replay.decodeChunks();
+        return replay;
+    }
+
+    constructor(buffer) {
+        this.bytes = new Uint8Array(buffer);
+        this.view = new DataView(buffer);
+
+        if (ascii(this.bytes.subarray(0, 4)) !== MAGIC) {
+            throw new Error("Not an Evolution Game replay file");
+        }
+
+        const headerLength = this.view.getUint32(4, true);
+        this.header = JSON.parse(new TextDecoder().decode(this.bytes.subarray(8, 8 + headerLength)));
+        this.width = this.header.width;
+        this.height = this.header.height;
+        this.cells = this.width * this.height;
+        this.start = 8 + headerLength;
+    }
+
+    chunkOffsets() {
+        const end = this.bytes.length;
+        if (ascii(this.bytes.subarray(end - 4)) === INDEX_MAGIC) {
+            const indexOffset = Number(this.view.getBigUint64(end - 12, true));
+            const count = this.view.getUint32(indexOffset, true);
+            const offsets = [];
+            for (let i = 0; i < count; i++) {
+                offsets.push(Number(this.view.getBigUint64(indexOffset + 4 + 12 * i + 4, true)));
+            }
+            return offsets;
+        }
+
+        // Unfinished recording: walk the length-prefixed chunks
+        const offsets = [];
+        for (let offset = this.start; offset + 4 <= end; ) {
+            const length = this.view.getUint32(offset, true);
+            if (offset + 4 + length > end) break;
+            offsets.push(offset);
+            offset += 4 + length;
+        }
+        return offsets;
+    }
+
+    async decodeChunks() {
+        // frames[i] = {tick, chunk, offset, kind, count}, offsets into chunk payloads
+        this.chunks = [];
+        this.frames = [];
+        this.keyframes = [];
+
+        for (const offset of this.chunkOffsets()) {
+            const length = this.view.getUint32(offset, true);
+            const payload = await inflate(this.bytes.subarray(offset + 4, offset + 4 + length));
+            const view = new DataView(payload.buffer);
+            const chunk = this.chunks.length;
+            this.chunks.push(payload);
+
+            for (let position = 0; position < payload.length; ) {
+                const kind = payload[position];
+                const tick = view.getUint32(position + 1, true);
+                const frame = { tick, chunk, kind, offset: position + 5, count: 0 };
+                position += 5;
+
+                if (kind === KEYFRAME) {
+                    this.keyframes.push(this.frames.length);
+                    position += LAYERS * this.cells;
+                } else {
+                    frame.count = view.getUint32(position, true);
+                    frame.offset = position + 4;
+                    position = readVarints(payload, position + 4, frame.count)[1] + LAYERS * frame.count;
+                }
+                this.frames.push(frame);
+            }
+        }
+    }
+
+    // Rebuild the layers of frame i, reusing `state` when moving forward
+
+    seek(target, state, current) {
+        let first = this.keyframes.filter((k) => k <= target).pop();
+        if (current >= 0 && current <= target && this.frames[current].chunk === this.frames[target].chunk) {
+            first = current + 1;
+        }
+
+        for (let i = first; i <= target; i++) {
+            this.apply(this.frames[i], state);
+        }
+        return target;
+    }
+
+    apply(frame, state) {
+        const payload = this.chunks[frame.chunk];
+
+        if (frame.kind === KEYFRAME) {
+            state.set(payload.subarray(frame.offset, frame.offset + LAYERS * this.cells));
+            return;
+        }
+
+        const [gaps, valuesOffset] = readVarints(payload, frame.offset, frame.count);
+        let index = 0;
+        for (let i = 0; i < frame.count; i++) {
+            index += gaps[i];
+            for (let layer = 0; layer < LAYERS; layer++) {
+                state[layer * this.cells + index] = payload[valuesOffset + layer * frame.count + i];
+            }
+        }
+    }
+}
+
+// Display Types, Mirroring Cell.draw_* in EvolutionGame.py
+
+function colorOf(replay, state, i, display) {
+    const colors = replay.header.colors;
+    const organic = state[ORGANIC * replay.cells + i];
+
+    if (display === "soil") {
+        return [255, 255 - organic, 0];
+    }
+
+    if (display === "energy") {
+        const level = organic / 255;
+        if (level < 0.5) {
+            return [255 * level * 2, 255 * level * 2, 255 * (1 - level)];
+        }
+        return [255 * (1 - level), 255 * (1 - level), 255 * (1 - level) * 2];
+    }
+
+    switch (state[TYPE * replay.cells + i]) {
+        case LEAF: return colors.leaf;
+        case ROOT: return colors.root;
+        case RADIO: return colors.radio;
+        case NEWBORN: return colors.newborn;
+        case PIPE: return replay.header.families[state[FAMILY * replay.cells + i] - 1] || colors.newborn;
+    }
+
+    if (state[ENERGY * replay.cells + i] > replay.header.thresholds.energy) return colors.energic_toxic;
+    if (organic > replay.header.thresholds.organic) return colors.organic_toxic;
+    return colors.background;
+}
+
+class Player {
+    constructor(canvas, controls) {
+        this.canvas = canvas;
+        this.controls = controls;
+        this.replay = null;
+        this.playing = false;
+        this.frame = -1;
+
+        controls.play.addEventListener("click", () => this.toggle());
+        controls.seek.addEventListener("input", () => this.show(Number(controls.seek.value)));
+        controls.display.addEventListener("change", () => this.draw());
+    }
+
+    open(replay) {
+        this.replay = replay;
+        this.state = new Uint8Array(LAYERS * replay.cells);
+        this.image = new ImageData(replay.width, replay.height);
+        this.buffer = document.createElement("canvas");
+        this.buffer.width = replay.width;
+        this.buffer.height = replay.height;
+
+        const scale = Math.max(1, Math.floor(Math.min(900 / replay.width, 900 / replay.height)));
+        this.canvas.width = replay.width * scale;
+        this.canvas.height = replay.height * scale;
+
+        this.controls.seek.max = replay.frames.length - 1;
+        this.frame = -1;
+        this.show(0);
+    }
+
+    show(target) {
+        this.frame = this.replay.seek(target, this.state, this.frame);
+        this.controls.seek.value = this.frame;
+        this.controls.tick.textContent = `Day ${this.replay.frames[this.frame].tick}`;
+        this.draw();
+    }
+
+    draw() {
+        const replay = this.replay;
+        const display = this.controls.display.value;
+        const pixels = this.image.data;
+
+        for (let i = 0; i < replay.cells; i++) {
+            const [r, g, b] = colorOf(replay, this.state, i, display);
+            pixels[4 * i] = r;
+            pixels[4 * i + 1] = g;
+            pixels[4 * i + 2] = b;
+            pixels[4 * i + 3] = 255;
+        }
+
+        this.buffer.getContext("2d").putImageData(this.image, 0, 0);
+        const context = this.canvas.getContext("2d");
+        context.imageSmoothingEnabled = false;
+        context.drawImage(this.buffer, 0, 0, this.canvas.width, this.canvas.height);
+    }
+
+    toggle() {
+        this.playing = !this.playing;
+        this.controls.play.textContent = this.playing ? "Pause" : "Play";
+
+        const tick = () => {
+            if (!this.playing) return;
+            if (this.frame + 1 < this.replay.frames.length) {
+                this.show(this.frame + 1);
+                setTimeout(tick, 1000 / Number(this.controls.fps.value));
+            } else {
+                this.toggle();
+            }
+        };
+        tick();
+    }
+}